@@ -1,10 +1,8 @@
-import uuid
-from datetime import datetime, timezone
-from typing import List, Optional
-from collections import defaultdict
+from typing import List, Optional, Tuple
+from itertools import groupby
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func
+from sqlalchemy import Row, select, func, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -17,13 +15,98 @@ from app.schemas.life_entry import (
     LifeEntryGroupedResponse,
     DateGroupedEntries,
 )
+from app.utils.clock import utc_now
+from app.utils.count_cache import cached_count, invalidate
+from app.utils.ids import uuid7
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+# Listings select just the response columns and skip ORM identity-map hydration
+LIFE_ENTRY_COLUMNS = tuple(getattr(LifeEntry, name) for name in LifeEntryResponse.model_fields)
+
+
+def _to_response(row: Row) -> LifeEntryResponse:
+    # Column types already match the schema, so validation can be skipped
+    mapping = row._mapping
+    return LifeEntryResponse.model_construct(
+        **{name: mapping[name] for name in LifeEntryResponse.model_fields}
+    )
+
+
+async def _fetch_entries_page(
+    db: AsyncSession,
+    page: int,
+    page_size: int,
+    include_deleted: bool,
+    cursor: Optional[str],
+) -> Tuple[List[LifeEntryResponse], int, int, Optional[str]]:
+    """
+    Load one page of life entries, newest first.
+    
+    With a cursor the page is located by keyset on (created_at, id); without
+    one the deprecated OFFSET-based ``page`` is used.
+    
+    Returns:
+        (entries, total, total_pages, next_cursor)
+    """
+    filters = [] if include_deleted else [LifeEntry.is_deleted == False]
+    order = (LifeEntry.created_at.desc(), LifeEntry.id.desc())
+    total = None
+    
+    # Fetch one extra row to find out whether another page follows
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = (
+            select(*LIFE_ENTRY_COLUMNS)
+            .where(
+                *filters,
+                tuple_(LifeEntry.created_at, LifeEntry.id) < tuple_(cursor_created_at, cursor_id)
+            )
+            .order_by(*order)
+            .limit(page_size + 1)
+        )
+        result = await db.execute(query)
+        entries = [_to_response(row) for row in result]
+    else:
+        # COUNT(*) OVER () is evaluated before OFFSET/LIMIT, so the page and
+        # the total come back in a single round trip
+        query = (
+            select(*LIFE_ENTRY_COLUMNS, func.count().over().label("total"))
+            .where(*filters)
+            .order_by(*order)
+            .offset((page - 1) * page_size)
+            .limit(page_size + 1)
+        )
+        result = await db.execute(query)
+        rows = result.all()
+        entries = [_to_response(row) for row in rows]
+        if rows:
+            total = rows[0].total
+    
+    # Keyset pages (and offset pages past the end) need a separate count
+    if total is None:
+        count_query = select(func.count(LifeEntry.id)).where(*filters)
+        total = await cached_count(
+            db, LifeEntry.__tablename__, "all" if include_deleted else "active", count_query
+        )
+    
+    # Calculate pagination
+    total_pages = (total + page_size - 1) // page_size if total > 0 else 1
+    
+    next_cursor = None
+    if len(entries) > page_size:
+        entries = entries[:page_size]
+        last = entries[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    
+    return entries, total, total_pages, next_cursor
+
 
 @router.get("", response_model=LifeEntryPaginatedResponse)
 async def get_life_entries(
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    page: int = Query(1, ge=1, description="Page number (deprecated, use cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     include_deleted: bool = Query(False, description="Include soft-deleted entries"),
     db: AsyncSession = Depends(get_db)
@@ -34,43 +117,25 @@ async def get_life_entries(
     Returns entries in reverse chronological order (newest first).
     Requirements: 8.2, 8.6
     """
-    # Build base query
-    base_query = select(LifeEntry)
-    if not include_deleted:
-        base_query = base_query.where(LifeEntry.is_deleted == False)
-    
-    # Get total count
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Calculate pagination
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-    offset = (page - 1) * page_size
-    
-    # Get paginated entries ordered by created_at descending (newest first)
-    query = (
-        base_query
-        .order_by(LifeEntry.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
+    entries, total, total_pages, next_cursor = await _fetch_entries_page(
+        db, page, page_size, include_deleted, cursor
     )
-    result = await db.execute(query)
-    entries = result.scalars().all()
     
     return LifeEntryPaginatedResponse(
         items=entries,
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
 
 @router.get("/grouped", response_model=LifeEntryGroupedResponse)
 async def get_life_entries_grouped(
-    page: int = Query(1, ge=1, description="Page number"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    page: int = Query(1, ge=1, description="Page number (deprecated, use cursor)"),
     page_size: int = Query(20, ge=1, le=100, description="Items per page"),
     include_deleted: bool = Query(False, description="Include soft-deleted entries"),
     db: AsyncSession = Depends(get_db)
@@ -81,40 +146,17 @@ async def get_life_entries_grouped(
     Returns entries grouped by date in reverse chronological order.
     Requirements: 8.5, 8.6
     """
-    # Build base query
-    base_query = select(LifeEntry)
-    if not include_deleted:
-        base_query = base_query.where(LifeEntry.is_deleted == False)
-    
-    # Get total count
-    count_query = select(func.count()).select_from(base_query.subquery())
-    total_result = await db.execute(count_query)
-    total = total_result.scalar() or 0
-    
-    # Calculate pagination
-    total_pages = (total + page_size - 1) // page_size if total > 0 else 1
-    offset = (page - 1) * page_size
-    
-    # Get paginated entries ordered by created_at descending
-    query = (
-        base_query
-        .order_by(LifeEntry.created_at.desc())
-        .offset(offset)
-        .limit(page_size)
+    entries, total, total_pages, next_cursor = await _fetch_entries_page(
+        db, page, page_size, include_deleted, cursor
     )
-    result = await db.execute(query)
-    entries = result.scalars().all()
-    
-    # Group entries by date
-    date_groups: dict = defaultdict(list)
-    for entry in entries:
-        entry_date = entry.created_at.date()
-        date_groups[entry_date].append(entry)
     
-    # Convert to response format, sorted by date descending
+    # Entries already arrive newest first, so each date forms one contiguous run
     groups = [
-        DateGroupedEntries(date=date, entries=entries_list)
-        for date, entries_list in sorted(date_groups.items(), reverse=True)
+        DateGroupedEntries(
+            date=entry_date,
+            entries=list(entries_of_day)
+        )
+        for entry_date, entries_of_day in groupby(entries, key=lambda e: e.created_at.date())
     ]
     
     return LifeEntryGroupedResponse(
@@ -122,15 +164,15 @@ async def get_life_entries_grouped(
         total=total,
         page=page,
         page_size=page_size,
-        total_pages=total_pages
+        total_pages=total_pages,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/{entry_id}", response_model=LifeEntryResponse)
 async def get_life_entry(entry_id: str, db: AsyncSession = Depends(get_db)):
     """Get a single life entry by ID."""
-    result = await db.execute(select(LifeEntry).where(LifeEntry.id == entry_id))
-    entry = result.scalar_one_or_none()
+    entry = await db.get(LifeEntry, entry_id)
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -149,16 +191,16 @@ async def create_life_entry(
     
     Requirements: 8.1
     """
-    now = datetime.now(timezone.utc)
+    now = utc_now()
     entry = LifeEntry(
-        id=str(uuid.uuid4()),
+        id=uuid7(),
         content=entry_data.content.strip(),
         created_at=now,
         updated_at=now
     )
     db.add(entry)
     await db.commit()
-    await db.refresh(entry)
+    invalidate(LifeEntry.__tablename__)
     return entry
 
 
@@ -174,21 +216,21 @@ async def update_life_entry(
     Updates content and updated_at timestamp while preserving original created_at.
     Requirements: 8.3
     """
-    result = await db.execute(select(LifeEntry).where(LifeEntry.id == entry_id))
-    entry = result.scalar_one_or_none()
+    entry = await db.get(LifeEntry, entry_id)
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Life entry with id '{entry_id}' not found"
         )
     
-    # Update content if provided
-    if entry_data.content is not None:
-        entry.content = entry_data.content.strip()
-        entry.updated_at = datetime.now(timezone.utc)
+    # Nothing to write: skip the transaction and keep updated_at as it was
+    content = entry_data.content.strip() if entry_data.content is not None else None
+    if content is None or content == entry.content:
+        return entry
     
+    entry.content = content
+    entry.updated_at = utc_now()
     await db.commit()
-    await db.refresh(entry)
     return entry
 
 
@@ -203,8 +245,7 @@ async def delete_life_entry(
     
     Requirements: 8.4
     """
-    result = await db.execute(select(LifeEntry).where(LifeEntry.id == entry_id))
-    entry = result.scalar_one_or_none()
+    entry = await db.get(LifeEntry, entry_id)
     if not entry:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -215,7 +256,8 @@ async def delete_life_entry(
         await db.delete(entry)
     else:
         entry.is_deleted = True
-        entry.updated_at = datetime.now(timezone.utc)
+        entry.updated_at = utc_now()
     
     await db.commit()
+    invalidate(LifeEntry.__tablename__)
     return None
@@ -1,32 +1,42 @@
-import uuid
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import Row, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.card_list import CardList
 from app.schemas.card_list import CardListCreate, CardListUpdate, CardListResponse
+from app.utils.ids import uuid7
 
 router = APIRouter()
 
+# Built once at import; the statement has no parameters, so every request reuses it.
+# Only the response columns are selected, skipping ORM identity-map hydration.
+ALL_LISTS_QUERY = select(
+    *(getattr(CardList, name) for name in CardListResponse.model_fields)
+).order_by(CardList.sort_order, CardList.created_at)
+
+
+def _to_response(row: Row) -> CardListResponse:
+    # Column types already match the schema, so validation can be skipped
+    mapping = row._mapping
+    return CardListResponse.model_construct(
+        **{name: mapping[name] for name in CardListResponse.model_fields}
+    )
+
 
 @router.get("", response_model=List[CardListResponse])
 async def get_lists(db: AsyncSession = Depends(get_db)):
     """Get all card lists ordered by sort_order."""
-    result = await db.execute(
-        select(CardList).order_by(CardList.sort_order, CardList.created_at)
-    )
-    lists = result.scalars().all()
-    return lists
+    result = await db.execute(ALL_LISTS_QUERY)
+    return [_to_response(row) for row in result]
 
 
 @router.get("/{list_id}", response_model=CardListResponse)
 async def get_list(list_id: str, db: AsyncSession = Depends(get_db)):
     """Get a single card list by ID."""
-    result = await db.execute(select(CardList).where(CardList.id == list_id))
-    card_list = result.scalar_one_or_none()
+    card_list = await db.get(CardList, list_id)
     if not card_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -49,14 +59,13 @@ async def create_list(
         )
     
     card_list = CardList(
-        id=str(uuid.uuid4()),
+        id=uuid7(),
         name=list_data.name.strip(),
         color=list_data.color,
         sort_order=list_data.sort_order
     )
     db.add(card_list)
     await db.commit()
-    await db.refresh(card_list)
     return card_list
 
 
@@ -67,8 +76,7 @@ async def update_list(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an existing card list."""
-    result = await db.execute(select(CardList).where(CardList.id == list_id))
-    card_list = result.scalar_one_or_none()
+    card_list = await db.get(CardList, list_id)
     if not card_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,16 +98,16 @@ async def update_list(
     if list_data.sort_order is not None:
         card_list.sort_order = list_data.sort_order
     
-    await db.commit()
-    await db.refresh(card_list)
+    # Assigning a value equal to the loaded one leaves no pending change
+    if db.is_modified(card_list):
+        await db.commit()
     return card_list
 
 
 @router.delete("/{list_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_list(list_id: str, db: AsyncSession = Depends(get_db)):
     """Delete a card list."""
-    result = await db.execute(select(CardList).where(CardList.id == list_id))
-    card_list = result.scalar_one_or_none()
+    card_list = await db.get(CardList, list_id)
     if not card_list:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,9 +1,8 @@
-import uuid
-from datetime import datetime
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, desc
+from sqlalchemy import Row, select, func, desc, tuple_
 
 from app.database import get_db
 from app.models.notification import Notification
@@ -14,51 +13,91 @@ from app.schemas.notification import (
     UnreadCountResponse,
 )
 from app.services.notification_service import NotificationService
+from app.utils.clock import utc_now
+from app.utils.count_cache import cached_count, invalidate
+from app.utils.ids import uuid7
+from app.utils.pagination import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+# 整个列表一次校验，复用缓存的 core schema
+NOTIFICATION_LIST_ADAPTER = TypeAdapter(List[NotificationResponse])
+
+# 列表只查询响应需要的列，省去 ORM 实例的构建和 identity map 登记
+NOTIFICATION_COLUMNS = tuple(getattr(Notification, name) for name in NotificationResponse.model_fields)
+
+# COUNT(*) 不必逐行检查列值，配合部分索引 ix_notification_unread 只读索引
+UNREAD_COUNT_QUERY = select(func.count()).select_from(Notification).where(Notification.is_read == False)
+TOTAL_COUNT_QUERY = select(func.count()).select_from(Notification)
+
+
+def _to_response(row: Row) -> NotificationResponse:
+    # 列类型与响应模型一致，跳过校验直接构造
+    mapping = row._mapping
+    return NotificationResponse.model_construct(
+        **{name: mapping[name] for name in NotificationResponse.model_fields}
+    )
+
 
 @router.get("", response_model=NotificationListResponse)
 async def get_notifications(
     limit: int = 50,
     offset: int = 0,
     unread_only: bool = False,
+    cursor: Optional[str] = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """获取通知列表，按创建时间降序排列"""
-    query = select(Notification).order_by(desc(Notification.created_at))
+    """获取通知列表，按创建时间降序排列
+
+    传入 cursor（上一页返回的 next_cursor）时使用键集分页，忽略 offset；
+    offset 分页保留用于兼容旧客户端。
+    """
+    query = (
+        select(*NOTIFICATION_COLUMNS)
+        .order_by(desc(Notification.created_at), desc(Notification.id))
+    )
     
     if unread_only:
         query = query.where(Notification.is_read == False)
     
-    query = query.limit(limit).offset(offset)
+    if cursor is not None:
+        cursor_created_at, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Notification.created_at, Notification.id) < tuple_(cursor_created_at, cursor_id)
+        )
+    else:
+        query = query.offset(offset)
     
-    result = await db.execute(query)
-    notifications = result.scalars().all()
+    # 多取一条用于判断是否还有下一页；过滤和排序直接作用在表上，可以走 (created_at, id) 索引
+    result = await db.execute(query.limit(limit + 1))
+    notifications = [_to_response(row) for row in result]
     
-    # 获取总数
-    total_query = select(func.count(Notification.id))
-    total_result = await db.execute(total_query)
-    total = total_result.scalar() or 0
+    # 总数与未读数统计的是全部通知，不受 unread_only/cursor 影响，使用带短期缓存的独立计数
+    total = await cached_count(
+        db, Notification.__tablename__, "total", TOTAL_COUNT_QUERY
+    )
+    unread_count = await cached_count(
+        db, Notification.__tablename__, "unread", UNREAD_COUNT_QUERY
+    )
     
-    # 获取未读数
-    unread_query = select(func.count(Notification.id)).where(Notification.is_read == False)
-    unread_result = await db.execute(unread_query)
-    unread_count = unread_result.scalar() or 0
+    next_cursor = None
+    if len(notifications) > limit:
+        notifications = notifications[:limit]
+        last = notifications[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
     
     return NotificationListResponse(
-        notifications=[NotificationResponse.model_validate(n) for n in notifications],
+        notifications=notifications,
         total=total,
-        unread_count=unread_count
+        unread_count=unread_count,
+        next_cursor=next_cursor
     )
 
 
 @router.get("/unread-count", response_model=UnreadCountResponse)
 async def get_unread_count(db: AsyncSession = Depends(get_db)):
     """获取未读通知数量"""
-    query = select(func.count(Notification.id)).where(Notification.is_read == False)
-    result = await db.execute(query)
-    count = result.scalar() or 0
+    count = await cached_count(db, Notification.__tablename__, "unread", UNREAD_COUNT_QUERY)
     return UnreadCountResponse(count=count)
 
 
@@ -68,19 +107,22 @@ async def create_notification(
     db: AsyncSession = Depends(get_db)
 ):
     """创建新通知（内部使用）"""
+    data = notification.data or {}
     new_notification = Notification(
-        id=str(uuid.uuid4()),
+        id=uuid7(),
         type=notification.type,
         title=notification.title,
         message=notification.message,
         data=notification.data,
         is_read=False,
-        created_at=datetime.utcnow(),
-        user_id="default"
+        created_at=utc_now(),
+        user_id="default",
+        related_habit_id=data.get("habit_id"),
+        milestone=data.get("milestone")
     )
     db.add(new_notification)
     await db.commit()
-    await db.refresh(new_notification)
+    invalidate(Notification.__tablename__)
     return NotificationResponse.model_validate(new_notification)
 
 
@@ -90,17 +132,14 @@ async def mark_as_read(
     db: AsyncSession = Depends(get_db)
 ):
     """标记通知为已读"""
-    result = await db.execute(
-        select(Notification).where(Notification.id == notification_id)
-    )
-    notification = result.scalar_one_or_none()
+    notification = await db.get(Notification, notification_id)
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
     notification.is_read = True
     await db.commit()
-    await db.refresh(notification)
+    invalidate(Notification.__tablename__)
     return NotificationResponse.model_validate(notification)
 
 
@@ -116,6 +155,7 @@ async def mark_all_as_read(db: AsyncSession = Depends(get_db)):
         .values(is_read=True)
     )
     await db.commit()
+    invalidate(Notification.__tablename__)
     
     return {"message": "All notifications marked as read", "count": result.rowcount}
 
@@ -126,25 +166,31 @@ async def delete_notification(
     db: AsyncSession = Depends(get_db)
 ):
     """删除通知"""
-    result = await db.execute(
-        select(Notification).where(Notification.id == notification_id)
-    )
-    notification = result.scalar_one_or_none()
+    notification = await db.get(Notification, notification_id)
     
     if not notification:
         raise HTTPException(status_code=404, detail="Notification not found")
     
     await db.delete(notification)
     await db.commit()
+    invalidate(Notification.__tablename__)
     return {"message": "Notification deleted"}
 
 
+@router.post("/generate", response_model=List[NotificationResponse])
+async def generate_notifications(db: AsyncSession = Depends(get_db)):
+    """生成今日全部通知（习惯提醒、风险提醒、每日完成），习惯只查询一次"""
+    service = NotificationService(db)
+    notifications = await service.refresh_all()
+    return NOTIFICATION_LIST_ADAPTER.validate_python(notifications, from_attributes=True)
+
+
 @router.post("/generate-reminders", response_model=List[NotificationResponse])
 async def generate_habit_reminders(db: AsyncSession = Depends(get_db)):
     """生成今日习惯提醒通知"""
     service = NotificationService(db)
     notifications = await service.generate_habit_reminders()
-    return [NotificationResponse.model_validate(n) for n in notifications]
+    return NOTIFICATION_LIST_ADAPTER.validate_python(notifications, from_attributes=True)
 
 
 @router.post("/generate-at-risk", response_model=List[NotificationResponse])
@@ -152,4 +198,4 @@ async def generate_at_risk_notifications(db: AsyncSession = Depends(get_db)):
     """生成连续打卡风险提醒"""
     service = NotificationService(db)
     notifications = await service.generate_at_risk_notifications()
-    return [NotificationResponse.model_validate(n) for n in notifications]
+    return NOTIFICATION_LIST_ADAPTER.validate_python(notifications, from_attributes=True)
@@ -1,45 +1,51 @@
 from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from sqlalchemy import select
-from typing import Dict, Any
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import Dict, Any, AsyncIterator
 import json
+import orjson
 
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models.setting import Setting
 from app.models.task_card import TaskCard
 from app.models.card_list import CardList
 from app.models.life_entry import LifeEntry
 from app.models.checkin_record import CheckinRecord
+from app.utils.clock import utc_now
 
 router = APIRouter()
 
 
+# 数据库中不存在时返回的默认设置
+DEFAULT_SETTINGS: Dict[str, Any] = {
+    "notificationsEnabled": True,
+    "theme": "system"
+}
+
+
+def _parse_setting_value(value: str | None) -> Any:
+    """解析存储的设置值；字符串按原样存储，无法按 JSON 解析时返回原始字符串"""
+    if not value:
+        return None
+    try:
+        return orjson.loads(value)
+    except orjson.JSONDecodeError:
+        return value
+
+
+async def _load_settings(db: AsyncSession) -> Dict[str, Any]:
+    """读取全部设置并补齐默认值"""
+    result = await db.execute(select(Setting.key, Setting.value))
+    stored = {key: _parse_setting_value(value) for key, value in result}
+    return DEFAULT_SETTINGS | stored
+
+
 @router.get("")
 async def get_settings(db: AsyncSession = Depends(get_db)) -> Dict[str, Any]:
     """获取所有设置"""
-    result = await db.execute(select(Setting))
-    settings = result.scalars().all()
-    
-    # 转换为字典格式
-    settings_dict: Dict[str, Any] = {}
-    for setting in settings:
-        try:
-            settings_dict[setting.key] = json.loads(setting.value) if setting.value else None
-        except json.JSONDecodeError:
-            settings_dict[setting.key] = setting.value
-    
-    # 返回默认值（如果设置不存在）
-    defaults = {
-        "notificationsEnabled": True,
-        "theme": "system"
-    }
-    
-    for key, default_value in defaults.items():
-        if key not in settings_dict:
-            settings_dict[key] = default_value
-    
-    return settings_dict
+    return await _load_settings(db)
 
 
 @router.put("")
@@ -48,104 +54,123 @@ async def update_settings(
     db: AsyncSession = Depends(get_db)
 ) -> Dict[str, Any]:
     """更新设置"""
-    for key, value in updates.items():
-        # 查找现有设置
-        result = await db.execute(select(Setting).where(Setting.key == key))
-        setting = result.scalar_one_or_none()
-        
+    if updates:
+        now = utc_now()
         # 序列化值
-        serialized_value = json.dumps(value) if not isinstance(value, str) else value
+        rows = [
+            {
+                "key": key,
+                "value": json.dumps(value) if not isinstance(value, str) else value,
+                "updated_at": now,
+            }
+            for key, value in updates.items()
+        ]
         
-        if setting:
-            setting.value = serialized_value
-        else:
-            new_setting = Setting(key=key, value=serialized_value)
-            db.add(new_setting)
-    
-    await db.commit()
+        # 单条 INSERT ... ON CONFLICT(key) DO UPDATE 写入全部设置，
+        # 取代逐个键的 SELECT + UPDATE/INSERT
+        stmt = sqlite_insert(Setting).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Setting.key],
+            set_={"value": stmt.excluded.value, "updated_at": stmt.excluded.updated_at},
+        )
+        await db.execute(stmt)
+        await db.commit()
     
     # 返回更新后的所有设置
-    return await get_settings(db)
+    return await _load_settings(db)
 
 
-@router.get("/export")
-async def export_data(db: AsyncSession = Depends(get_db)) -> JSONResponse:
-    """导出所有用户数据为 JSON 格式"""
-    
-    # 获取所有卡片列表
-    lists_result = await db.execute(select(CardList))
-    card_lists = lists_result.scalars().all()
-    
-    # 获取所有任务卡片（包括已删除的）
-    tasks_result = await db.execute(select(TaskCard))
-    tasks = tasks_result.scalars().all()
-    
-    # 获取所有打卡记录
-    checkins_result = await db.execute(select(CheckinRecord))
-    checkins = checkins_result.scalars().all()
-    
-    # 获取所有生活记录（包括已删除的）
-    entries_result = await db.execute(select(LifeEntry))
-    life_entries = entries_result.scalars().all()
-    
-    # 获取所有设置
-    settings_result = await db.execute(select(Setting))
-    settings = settings_result.scalars().all()
-    
-    # 构建导出数据
-    export_data = {
-        "exportVersion": "1.0",
-        "exportDate": __import__("datetime").datetime.utcnow().isoformat(),
-        "cardLists": [
-            {
-                "id": lst.id,
-                "name": lst.name,
-                "color": lst.color,
-                "sortOrder": lst.sort_order,
-                "createdAt": lst.created_at.isoformat() if lst.created_at else None
-            }
-            for lst in card_lists
-        ],
-        "taskCards": [
-            {
-                "id": task.id,
-                "title": task.title,
-                "content": task.content,
-                "listId": task.list_id,
-                "isHabit": task.is_habit,
-                "reminderTime": task.reminder_time.isoformat() if task.reminder_time else None,
-                "currentStreak": task.current_streak,
-                "longestStreak": task.longest_streak,
-                "lastCheckinDate": task.last_checkin_date.isoformat() if task.last_checkin_date else None,
-                "createdAt": task.created_at.isoformat() if task.created_at else None,
-                "updatedAt": task.updated_at.isoformat() if task.updated_at else None,
-                "isDeleted": task.is_deleted
-            }
-            for task in tasks
-        ],
-        "checkinRecords": [
-            {
-                "id": checkin.id,
-                "taskId": checkin.task_id,
-                "checkinDate": checkin.checkin_date.isoformat() if checkin.checkin_date else None,
-                "checkinTime": checkin.checkin_time.isoformat() if checkin.checkin_time else None
-            }
-            for checkin in checkins
-        ],
-        "lifeEntries": [
-            {
-                "id": entry.id,
-                "content": entry.content,
-                "createdAt": entry.created_at.isoformat() if entry.created_at else None,
-                "updatedAt": entry.updated_at.isoformat() if entry.updated_at else None,
-                "isDeleted": entry.is_deleted
-            }
-            for entry in life_entries
-        ],
-        "settings": {
-            setting.key: json.loads(setting.value) if setting.value else None
-            for setting in settings
-        }
+# 导出时每批从游标读取的行数
+EXPORT_BATCH_SIZE = 500
+
+
+def _export_card_list(lst: CardList) -> Dict[str, Any]:
+    return {
+        "id": lst.id,
+        "name": lst.name,
+        "color": lst.color,
+        "sortOrder": lst.sort_order,
+        "createdAt": lst.created_at
     }
-    
-    return JSONResponse(content=export_data)
+
+
+def _export_task_card(task: TaskCard) -> Dict[str, Any]:
+    return {
+        "id": task.id,
+        "title": task.title,
+        "content": task.content,
+        "listId": task.list_id,
+        "isHabit": task.is_habit,
+        "reminderTime": task.reminder_time,
+        "currentStreak": task.current_streak,
+        "longestStreak": task.longest_streak,
+        "lastCheckinDate": task.last_checkin_date,
+        "createdAt": task.created_at,
+        "updatedAt": task.updated_at,
+        "isDeleted": task.is_deleted
+    }
+
+
+def _export_checkin_record(checkin: CheckinRecord) -> Dict[str, Any]:
+    return {
+        "id": checkin.id,
+        "taskId": checkin.task_id,
+        "checkinDate": checkin.checkin_date,
+        "checkinTime": checkin.checkin_time
+    }
+
+
+def _export_life_entry(entry: LifeEntry) -> Dict[str, Any]:
+    return {
+        "id": entry.id,
+        "content": entry.content,
+        "createdAt": entry.created_at,
+        "updatedAt": entry.updated_at,
+        "isDeleted": entry.is_deleted
+    }
+
+
+# (字段名, 模型, 行序列化函数)；任务卡片和生活记录包括已删除的
+EXPORT_SECTIONS = (
+    ("cardLists", CardList, _export_card_list),
+    ("taskCards", TaskCard, _export_task_card),
+    ("checkinRecords", CheckinRecord, _export_checkin_record),
+    ("lifeEntries", LifeEntry, _export_life_entry),
+)
+
+
+async def _stream_export(session_factory: async_sessionmaker) -> AsyncIterator[bytes]:
+    """
+    逐批读取各表并输出 JSON 片段
+
+    orjson 原生序列化 datetime/date，内存占用与批大小相关而与数据总量无关
+    """
+    async with session_factory() as session:
+        yield b'{"exportVersion":"1.0","exportDate":'
+        yield orjson.dumps(utc_now())
+        
+        for name, model, serialize in EXPORT_SECTIONS:
+            yield b',"' + name.encode() + b'":['
+            # 直接读取列，跳过 ORM 实例构建；Row 同样支持按属性名取值
+            result = await session.stream(
+                select(*model.__table__.columns).execution_options(yield_per=EXPORT_BATCH_SIZE)
+            )
+            first = True
+            async for batch in result.partitions():
+                chunk = b",".join(orjson.dumps(serialize(row)) for row in batch)
+                yield chunk if first else b"," + chunk
+                first = False
+            yield b"]"
+        
+        settings_result = await session.execute(select(Setting.key, Setting.value))
+        settings = {key: _parse_setting_value(value) for key, value in settings_result}
+        yield b',"settings":' + orjson.dumps(settings) + b"}"
+
+
+@router.get("/export")
+async def export_data(
+    session_factory: async_sessionmaker = Depends(get_session_factory)
+) -> StreamingResponse:
+    """导出所有用户数据为 JSON 格式（流式输出）"""
+    # 响应体在请求处理结束后才开始发送，因此流式读取使用独立会话
+    return StreamingResponse(_stream_export(session_factory), media_type="application/json")
@@ -1,36 +1,19 @@
-from datetime import date, datetime, timedelta, timezone
+from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy import select, func
+from sqlalchemy import select, func, exists
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.task_card import TaskCard
 from app.models.checkin_record import CheckinRecord
 from app.schemas.stats import DailyRingData, StatsOverview
+from app.utils.clock import get_local_date
 
 router = APIRouter()
 
 
-def get_local_date(timezone_offset_minutes: int = 0) -> date:
-    """
-    Get the current date in the user's local timezone.
-    
-    Args:
-        timezone_offset_minutes: Offset from UTC in minutes.
-            Positive values are west of UTC (e.g., 300 for UTC-5).
-            Negative values are east of UTC (e.g., -480 for UTC+8).
-    
-    Returns:
-        The current date in the user's local timezone.
-    """
-    utc_now = datetime.now(timezone.utc)
-    # Convert offset: positive offset means subtract from UTC
-    local_time = utc_now - timedelta(minutes=timezone_offset_minutes)
-    return local_time.date()
-
-
 async def calculate_daily_ring(
     db: AsyncSession,
     target_date: date
@@ -54,15 +37,17 @@ async def calculate_daily_ring(
     total_habits = total_result.scalar() or 0
     
     # Count completed habits for the target date
-    # A habit is completed if there's a check-in record for that date
+    # A habit is completed if there's a check-in record for that date; EXISTS stops
+    # at the first matching check-in per habit instead of de-duplicating with DISTINCT
     completed_habits_query = (
-        select(func.count(func.distinct(CheckinRecord.task_id)))
-        .select_from(CheckinRecord)
-        .join(TaskCard, CheckinRecord.task_id == TaskCard.id)
+        select(func.count(TaskCard.id))
         .where(
-            CheckinRecord.checkin_date == target_date,
             TaskCard.is_habit == True,
-            TaskCard.is_deleted == False
+            TaskCard.is_deleted == False,
+            exists().where(
+                CheckinRecord.task_id == TaskCard.id,
+                CheckinRecord.checkin_date == target_date
+            )
         )
     )
     completed_result = await db.execute(completed_habits_query)
@@ -96,27 +81,42 @@ async def calculate_stats_overview(
     Returns:
         StatsOverview with task counts, completion rate, longest streak, and today's check-ins
     """
-    # Count total non-deleted tasks
-    total_tasks_query = select(func.count(TaskCard.id)).where(
-        TaskCard.is_deleted == False
-    )
-    total_result = await db.execute(total_tasks_query)
-    total_tasks = total_result.scalar() or 0
-    
-    # Count completed tasks (non-habit tasks that are marked as completed via is_deleted=False 
-    # and have been checked in, or habit tasks with check-ins today)
-    # For this implementation, we consider a task "completed" if it's a habit task 
-    # that has been checked in today, or a non-habit task that has any check-in record
-    # However, based on the design, "completed" likely means tasks that have been done
-    # For simplicity, we'll count tasks that have at least one check-in record as "completed"
-    completed_tasks_query = (
+    # Count tasks that have at least one check-in record as "completed"
+    # (non-habit tasks with any check-in, or habit tasks that have been checked in)
+    completed_tasks_subquery = (
         select(func.count(func.distinct(TaskCard.id)))
         .select_from(TaskCard)
         .join(CheckinRecord, CheckinRecord.task_id == TaskCard.id)
         .where(TaskCard.is_deleted == False)
+        .scalar_subquery()
+    )
+    
+    # Count today's check-ins
+    today_checkins_subquery = (
+        select(func.count(CheckinRecord.id))
+        .where(CheckinRecord.checkin_date == target_date)
+        .scalar_subquery()
     )
-    completed_result = await db.execute(completed_tasks_query)
-    completed_tasks = completed_result.scalar() or 0
+    
+    # One statement for the whole report: a single scan of non-deleted tasks
+    # with conditional aggregates, plus the two check-in counts as scalar subqueries.
+    # The longest streak is the maximum of current_streak and longest_streak over
+    # habit tasks; the two aggregates are combined in Python because a two-argument
+    # MAX() is SQLite-only and GREATEST() does not exist there.
+    overview_query = select(
+        func.count(TaskCard.id).label("total_tasks"),
+        completed_tasks_subquery.label("completed_tasks"),
+        func.max(TaskCard.longest_streak).filter(TaskCard.is_habit == True).label("max_longest"),
+        func.max(TaskCard.current_streak).filter(TaskCard.is_habit == True).label("max_current"),
+        today_checkins_subquery.label("today_checkins"),
+    ).where(TaskCard.is_deleted == False)
+    overview_result = await db.execute(overview_query)
+    row = overview_result.one()
+    
+    total_tasks = row.total_tasks or 0
+    completed_tasks = row.completed_tasks or 0
+    longest_streak = max(row.max_longest or 0, row.max_current or 0)
+    today_checkins = row.today_checkins or 0
     
     # Pending tasks = total - completed
     pending_tasks = total_tasks - completed_tasks
@@ -127,26 +127,6 @@ async def calculate_stats_overview(
     else:
         completion_rate = (completed_tasks / total_tasks) * 100
     
-    # Find the longest streak across all habit tasks
-    # This is the maximum of current_streak and longest_streak for all habit tasks
-    longest_streak_query = select(
-        func.max(
-            func.max(TaskCard.current_streak, TaskCard.longest_streak)
-        )
-    ).where(
-        TaskCard.is_habit == True,
-        TaskCard.is_deleted == False
-    )
-    longest_streak_result = await db.execute(longest_streak_query)
-    longest_streak = longest_streak_result.scalar() or 0
-    
-    # Count today's check-ins
-    today_checkins_query = select(func.count(CheckinRecord.id)).where(
-        CheckinRecord.checkin_date == target_date
-    )
-    today_checkins_result = await db.execute(today_checkins_query)
-    today_checkins = today_checkins_result.scalar() or 0
-    
     return StatsOverview(
         total_tasks=total_tasks,
         completed_tasks=completed_tasks,
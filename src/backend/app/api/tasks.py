@@ -1,47 +1,83 @@
-import uuid
-from datetime import datetime, date, timedelta, timezone
-from typing import List, Optional
+import asyncio
+import logging
+from datetime import date
+from typing import List, Optional, Type, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy import Date, Update, bindparam, case, delete, exists, insert, lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
-from app.database import get_db
+from app.database import get_db, get_session_factory
 from app.models.task_card import TaskCard
 from app.models.checkin_record import CheckinRecord
-from app.schemas.task_card import TaskCardCreate, TaskCardUpdate, TaskCardResponse
+from app.schemas.task_card import TaskCardCreate, TaskCardUpdate, TaskCardResponse, TaskCardListItem
 from app.schemas.checkin_record import CheckinRequest, CheckinRecordResponse
-from app.services.notification_service import NotificationService
+from app.services.notification_service import ACHIEVEMENT_MILESTONES, NotificationService
+from app.utils.clock import get_local_date, utc_now
+from app.utils.ids import uuid7
+
+logger = logging.getLogger('lifeflow')
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[TaskCardResponse])
+def _task_columns(schema: Type[TaskCardListItem]) -> tuple:
+    return tuple(getattr(TaskCard, name) for name in schema.model_fields)
+
+
+# Listings select just the response columns and skip ORM identity-map hydration
+TASK_COLUMNS = _task_columns(TaskCardResponse)
+TASK_LIST_ITEM_COLUMNS = _task_columns(TaskCardListItem)
+CHECKIN_COLUMNS = tuple(getattr(CheckinRecord, name) for name in CheckinRecordResponse.model_fields)
+
+# Listings are serialized straight to JSON bytes in one pass; returning a
+# Response makes FastAPI skip its own validate-then-serialize of response_model
+# (which is still used for the OpenAPI schema)
+TASK_LIST_ADAPTER = TypeAdapter(List[Union[TaskCardResponse, TaskCardListItem]])
+CHECKIN_LIST_ADAPTER = TypeAdapter(List[CheckinRecordResponse])
+
+
+@router.get("", response_model=List[Union[TaskCardResponse, TaskCardListItem]])
 async def get_tasks(
     list_id: Optional[str] = Query(None, description="Filter by list ID"),
     include_deleted: bool = Query(False, description="Include soft-deleted tasks"),
+    include_content: bool = Query(True, description="Include the markdown content of each task"),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all task cards, optionally filtered by list_id."""
-    query = select(TaskCard)
+    """
+    Get all task cards, optionally filtered by list_id.
+    
+    With include_content=false the potentially large markdown bodies are
+    neither read from the database nor sent.
+    """
+    # lambda_stmt caches each combination of the lambdas below by code
+    # location, so the statement is not rebuilt and re-keyed per request;
+    # list_id becomes a bound parameter
+    if include_content:
+        schema = TaskCardResponse
+        query = lambda_stmt(lambda: select(*TASK_COLUMNS))
+    else:
+        schema = TaskCardListItem
+        query = lambda_stmt(lambda: select(*TASK_LIST_ITEM_COLUMNS))
     
     if not include_deleted:
-        query = query.where(TaskCard.is_deleted == False)
+        query += lambda s: s.where(TaskCard.is_deleted == False)
     
     if list_id is not None:
-        query = query.where(TaskCard.list_id == list_id)
+        query += lambda s: s.where(TaskCard.list_id == list_id)
     
-    query = query.order_by(TaskCard.created_at.desc())
+    query += lambda s: s.order_by(TaskCard.created_at.desc())
     result = await db.execute(query)
-    tasks = result.scalars().all()
-    return tasks
+    # Column types already match the schema, so validation can be skipped
+    tasks = [schema.model_construct(**row) for row in result.mappings()]
+    return Response(content=TASK_LIST_ADAPTER.dump_json(tasks), media_type="application/json")
 
 
 @router.get("/{task_id}", response_model=TaskCardResponse)
 async def get_task(task_id: str, db: AsyncSession = Depends(get_db)):
     """Get a single task card by ID."""
-    result = await db.execute(select(TaskCard).where(TaskCard.id == task_id))
-    task = result.scalar_one_or_none()
+    task = await db.get(TaskCard, task_id)
     if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -57,7 +93,7 @@ async def create_task(
 ):
     """Create a new task card."""
     task = TaskCard(
-        id=str(uuid.uuid4()),
+        id=uuid7(),
         title=task_data.title.strip(),
         content=task_data.content,
         list_id=task_data.list_id,
@@ -66,7 +102,6 @@ async def create_task(
     )
     db.add(task)
     await db.commit()
-    await db.refresh(task)
     return task
 
 
@@ -77,35 +112,46 @@ async def update_task(
     db: AsyncSession = Depends(get_db)
 ):
     """Update an existing task card."""
-    result = await db.execute(select(TaskCard).where(TaskCard.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with id '{task_id}' not found"
-        )
-    
-    # Update fields if provided
+    # Collect the provided fields
+    changes = {}
     if task_data.title is not None:
-        task.title = task_data.title.strip()
+        changes["title"] = task_data.title.strip()
     
     if task_data.content is not None:
-        task.content = task_data.content
+        changes["content"] = task_data.content
     
     if task_data.list_id is not None:
-        task.list_id = task_data.list_id
+        changes["list_id"] = task_data.list_id
     
     if task_data.is_habit is not None:
-        task.is_habit = task_data.is_habit
+        changes["is_habit"] = task_data.is_habit
     
     # Handle reminder time: clear_reminder takes precedence
     if task_data.clear_reminder:
-        task.reminder_time = None
+        changes["reminder_time"] = None
     elif task_data.reminder_time is not None:
-        task.reminder_time = task_data.reminder_time
+        changes["reminder_time"] = task_data.reminder_time
+    
+    if changes:
+        # Write and read back in one statement; no SELECT before the UPDATE
+        result = await db.execute(
+            update(TaskCard)
+            .where(TaskCard.id == task_id)
+            .values(**changes)
+            .returning(TaskCard)
+        )
+        task = result.scalar_one_or_none()
+    else:
+        task = await db.get(TaskCard, task_id)
     
-    await db.commit()
-    await db.refresh(task)
+    if not task:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with id '{task_id}' not found"
+        )
+    
+    if changes:
+        await db.commit()
     return task
 
 
@@ -116,76 +162,127 @@ async def delete_task(
     db: AsyncSession = Depends(get_db)
 ):
     """Soft delete a task card (or hard delete if specified)."""
-    result = await db.execute(select(TaskCard).where(TaskCard.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
+    # One statement both writes and reports whether the task existed
+    if hard_delete:
+        stmt = delete(TaskCard).where(TaskCard.id == task_id)
+    else:
+        stmt = update(TaskCard).where(TaskCard.id == task_id).values(is_deleted=True)
+    result = await db.execute(stmt.returning(TaskCard.id))
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Task with id '{task_id}' not found"
         )
     
-    if hard_delete:
-        await db.delete(task)
-    else:
-        task.is_deleted = True
-    
     await db.commit()
     return None
 
 
-def get_local_date(timezone_offset_minutes: int = 0) -> date:
+def _build_checkin_update() -> Update:
     """
-    Get the current date in the user's local timezone.
+    UPDATE that records a check-in on the task row and returns the task.
     
-    Args:
-        timezone_offset_minutes: Offset from UTC in minutes.
-            Positive values are west of UTC (e.g., 300 for UTC-5).
-            Negative values are east of UTC (e.g., -480 for UTC+8).
+    Built once at import with bind parameters for the task id and the user's
+    local ``today``/``yesterday``, so every check-in executes the same
+    statement and reuses its compiled form. The new streak is evaluated
+    inside the UPDATE against the row's current values: a check-in on the day
+    after the last one extends the streak, a repeat on the same day keeps it,
+    and anything else (first check-in or a missed day) starts over at 1.
     
-    Returns:
-        The current date in the user's local timezone.
+    The NOT EXISTS guard makes a repeated check-in on the same day a no-op,
+    also when two requests race (SQLite serializes the writes).
     """
-    utc_now = datetime.now(timezone.utc)
-    # Convert offset: positive offset means subtract from UTC
-    local_time = utc_now - timedelta(minutes=timezone_offset_minutes)
-    return local_time.date()
+    today = bindparam("today", type_=Date)
+    yesterday = bindparam("yesterday", type_=Date)
+    new_streak = case(
+        (TaskCard.last_checkin_date == today, TaskCard.current_streak),
+        (TaskCard.last_checkin_date == yesterday, TaskCard.current_streak + 1),
+        else_=1,
+    )
+    checked_in_today = exists().where(
+        CheckinRecord.task_id == TaskCard.id,
+        CheckinRecord.checkin_date == today
+    )
+    return (
+        update(TaskCard)
+        .where(TaskCard.id == bindparam("task_id"), ~checked_in_today)
+        .values(
+            current_streak=new_streak,
+            # CASE rather than a two-argument MAX(), which is SQLite-only
+            longest_streak=case(
+                (new_streak > TaskCard.longest_streak, new_streak),
+                else_=TaskCard.longest_streak,
+            ),
+            last_checkin_date=today,
+        )
+        .returning(TaskCard)
+    )
+
+
+CHECKIN_UPDATE = _build_checkin_update()
+
 
+async def _notify_streak_achievement(
+    session_factory: async_sessionmaker, task_id: str, streak: int, habit_title: str
+) -> None:
+    async with session_factory() as session:
+        await NotificationService(session).check_streak_achievement(
+            habit_id=task_id,
+            streak=streak,
+            habit_title=habit_title
+        )
+
+
+async def _notify_daily_complete(session_factory: async_sessionmaker, today: date) -> None:
+    async with session_factory() as session:
+        await NotificationService(session).check_daily_complete(today)
 
-def calculate_streak(last_checkin_date: Optional[date], current_streak: int, today: date) -> int:
+
+async def generate_checkin_notifications(
+    session_factory: async_sessionmaker,
+    task_id: str,
+    streak: int,
+    habit_title: str,
+    today: date,
+    is_habit: bool,
+) -> None:
     """
-    Calculate the new streak value based on the last check-in date.
-    
-    Args:
-        last_checkin_date: The date of the last check-in, or None if never checked in.
-        current_streak: The current streak count.
-        today: Today's date in the user's local timezone.
+    Create the achievement and daily-complete notifications for a check-in.
     
-    Returns:
-        The new streak value.
+    Runs as a background task after the response is sent, so it uses its own
+    sessions; the request-scoped one is already closed by then. The two checks
+    are independent and run concurrently, each on its own session (and so its
+    own pooled connection).
     """
-    if last_checkin_date is None:
-        # First check-in ever
-        return 1
-    
-    if last_checkin_date == today:
-        # Already checked in today, streak stays the same
-        return current_streak
-    
-    days_since_last = (today - last_checkin_date).days
-    
-    if days_since_last == 1:
-        # Consecutive day, increment streak
-        return current_streak + 1
-    else:
-        # Missed one or more days, reset streak
-        return 1
+    try:
+        async with asyncio.TaskGroup() as tg:
+            # Check for achievement milestone
+            if streak in ACHIEVEMENT_MILESTONES:
+                tg.create_task(
+                    _notify_streak_achievement(session_factory, task_id, streak, habit_title)
+                )
+            
+            # Check if all habits are completed today; only a habit check-in can change that
+            if is_habit:
+                tg.create_task(_notify_daily_complete(session_factory, today))
+    except Exception:
+        # The check-in itself is already committed; a failed notification must not surface
+        logger.exception("Failed to generate notifications for check-in of task %s", task_id)
 
 
 @router.post("/{task_id}/checkin", response_model=TaskCardResponse)
 async def checkin_task(
     task_id: str,
+    background_tasks: BackgroundTasks,
+    timezone_offset: Optional[int] = Query(
+        None,
+        ge=-840,
+        le=720,
+        description="Timezone offset from UTC in minutes. Positive values are west of UTC."
+    ),
     checkin_data: Optional[CheckinRequest] = None,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_db),
+    session_factory: async_sessionmaker = Depends(get_session_factory)
 ):
     """
     Check in on a habit task.
@@ -193,66 +290,53 @@ async def checkin_task(
     Creates a check-in record and updates the task's streak information.
     The streak is calculated based on consecutive daily check-ins in the user's timezone.
     """
-    result = await db.execute(select(TaskCard).where(TaskCard.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with id '{task_id}' not found"
-        )
-    
-    # Get timezone offset from request, default to UTC
-    timezone_offset = checkin_data.timezone_offset if checkin_data else 0
+    # Get timezone offset from the query string; the JSON body is still
+    # accepted for older clients. Default to UTC
+    if timezone_offset is None:
+        timezone_offset = (checkin_data.timezone_offset or 0) if checkin_data else 0
     
     # Get today's date in user's local timezone
     today = get_local_date(timezone_offset)
     
-    # Check if already checked in today
-    existing_checkin = await db.execute(
-        select(CheckinRecord).where(
-            CheckinRecord.task_id == task_id,
-            CheckinRecord.checkin_date == today
-        )
-    )
-    if existing_checkin.scalar_one_or_none():
-        # Already checked in today, just return the task
+    # Update the streak in SQL and get the task back in the same statement
+    result = await db.execute(CHECKIN_UPDATE, {
+        "task_id": task_id,
+        "today": today,
+        "yesterday": date.fromordinal(today.toordinal() - 1),
+    })
+    task = result.scalar_one_or_none()
+    if task is None:
+        # Either the task does not exist or it was already checked in today
+        task = await db.get(TaskCard, task_id)
+        if task is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Task with id '{task_id}' not found"
+            )
         return task
     
-    # Create check-in record
-    checkin_record = CheckinRecord(
-        id=str(uuid.uuid4()),
-        task_id=task_id,
-        checkin_date=today,
-        checkin_time=datetime.now(timezone.utc)
+    # Create check-in record in the same transaction; a Core INSERT goes out
+    # right away instead of through the unit-of-work flush at commit, and
+    # OR IGNORE turns a duplicate (task_id, checkin_date) into a no-op
+    await db.execute(
+        insert(CheckinRecord)
+        .prefix_with("OR IGNORE")
+        .values(id=uuid7(), task_id=task_id, checkin_date=today, checkin_time=utc_now())
     )
-    db.add(checkin_record)
-    
-    # Calculate new streak
-    new_streak = calculate_streak(task.last_checkin_date, task.current_streak, today)
-    
-    # Update task streak information
-    task.current_streak = new_streak
-    task.last_checkin_date = today
-    
-    # Update longest streak if current exceeds it
-    if new_streak > task.longest_streak:
-        task.longest_streak = new_streak
-    
     await db.commit()
-    await db.refresh(task)
-    
-    # Generate notifications after successful check-in
-    notification_service = NotificationService(db)
     
-    # Check for achievement milestone
-    await notification_service.check_streak_achievement(
-        habit_id=task_id,
-        streak=new_streak,
-        habit_title=task.title
-    )
-    
-    # Check if all habits are completed today
-    await notification_service.check_daily_complete()
+    # Notifications are not part of the response; generate them after it is sent,
+    # and only when one of them can actually fire
+    if task.current_streak in ACHIEVEMENT_MILESTONES or task.is_habit:
+        background_tasks.add_task(
+            generate_checkin_notifications,
+            session_factory,
+            task_id,
+            task.current_streak,
+            task.title,
+            today,
+            task.is_habit,
+        )
     
     return task
 
@@ -264,22 +348,20 @@ async def get_task_checkins(
     db: AsyncSession = Depends(get_db)
 ):
     """Get check-in records for a task, ordered by date descending."""
-    # Verify task exists
-    result = await db.execute(select(TaskCard).where(TaskCard.id == task_id))
-    task = result.scalar_one_or_none()
-    if not task:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task with id '{task_id}' not found"
-        )
-    
-    # Get check-in records
-    query = (
-        select(CheckinRecord)
-        .where(CheckinRecord.task_id == task_id)
+    query = lambda_stmt(
+        lambda: select(*CHECKIN_COLUMNS)
+        .join(CheckinRecord.task)
+        .where(TaskCard.id == task_id)
         .order_by(CheckinRecord.checkin_date.desc())
         .limit(limit)
     )
     result = await db.execute(query)
-    records = result.scalars().all()
-    return records
+    records = [CheckinRecordResponse.model_construct(**row) for row in result.mappings()]
+    
+    # Rows only come back while the task exists, so only an empty page needs the existence check
+    if not records and await db.get(TaskCard, task_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Task with id '{task_id}' not found"
+        )
+    return Response(content=CHECKIN_LIST_ADAPTER.dump_json(records), media_type="application/json")
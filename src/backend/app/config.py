@@ -1,9 +1,13 @@
 import os
 import sys
+from functools import lru_cache
 from pathlib import Path
-from pydantic_settings import BaseSettings
+from typing import Any
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
+@lru_cache(maxsize=1)
 def get_default_db_path() -> Path:
     """Get the default database path based on the running environment."""
     # Check if running as PyInstaller bundle
@@ -28,16 +32,21 @@ class Settings(BaseSettings):
     database_url: str = ""
     database_path: Path = Path("./lifeflow.db")
 
-    class Config:
-        env_prefix = "LIFEFLOW_"
+    model_config = SettingsConfigDict(env_prefix="LIFEFLOW_", frozen=True)
 
-    def __init__(self, **kwargs):
-        super().__init__(**kwargs)
-        # Set default database path if not provided via environment
-        if not self.database_url or self.database_url == "":
+    @model_validator(mode="before")
+    @classmethod
+    def default_database(cls, data: Any) -> Any:
+        # Set default database path if not provided via environment;
+        # runs before validation so the frozen instance is never mutated
+        if isinstance(data, dict) and not data.get("database_url"):
             default_path = get_default_db_path()
-            self.database_path = default_path
-            self.database_url = f"sqlite+aiosqlite:///{default_path}"
+            data = {
+                **data,
+                "database_path": default_path,
+                "database_url": f"sqlite+aiosqlite:///{default_path}",
+            }
+        return data
 
 
 settings = Settings()
@@ -1,9 +1,56 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+import logging
+
+from sqlalchemy import event, func, inspect, select
+from sqlalchemy.schema import CreateIndex
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 
 from app.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False)
+logger = logging.getLogger('lifeflow')
+
+# Applied to every new SQLite connection:
+# - WAL lets readers proceed while a write is in progress
+# - synchronous=NORMAL skips the fsync per commit (still safe with WAL)
+# - 64 MiB page cache, 256 MiB memory map, temp tables in memory
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def make_engine(url: str) -> AsyncEngine:
+    """
+    Create the async engine for ``url``.
+    
+    File databases keep the default queue pool, so connections (and the
+    PRAGMAs set on them once at connect) are reused across requests rather
+    than reopened. A StaticPool would funnel every session through one
+    connection and serialize concurrent sessions.
+    """
+    engine = create_async_engine(url, echo=False)
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+engine = make_engine(settings.database_url)
+# An AsyncSession runs one statement at a time: never have two awaits on the
+# same session in flight (e.g. via asyncio.gather), that fails with "another
+# operation is in progress". Concurrent work takes one session per task; the
+# default pool (5 connections plus 10 overflow) hands each its own connection.
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -19,7 +66,99 @@ async def get_db():
             await session.close()
 
 
+def get_session_factory() -> async_sessionmaker:
+    """
+    Session factory for work that outlives the request, such as background tasks.
+    
+    A dependency rather than a direct import so it can be overridden together
+    with ``get_db``.
+    """
+    return async_session
+
+
+# Indexes declared by earlier versions and since replaced; dropped on startup
+OBSOLETE_INDEXES = (
+    "ix_notification_type_habit_milestone",
+)
+
+# Declared unique after older databases may already hold duplicates
+CHECKIN_UNIQUE_INDEX = "ix_checkin_task_date"
+
+
+def _add_missing_columns(sync_conn) -> None:
+    """
+    Add columns declared after a table was created.
+    
+    create_all never alters existing tables. New columns must be nullable;
+    a column's ``info["backfill"]`` SQLAlchemy expression fills it for existing rows.
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            # SQLAlchemy has no ADD COLUMN construct; names are quoted and the
+            # type is compiled by the dialect
+            column_type = column.type.compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} "
+                f"ADD COLUMN {preparer.format_column(column)} {column_type}"
+            )
+            backfill = column.info.get("backfill")
+            if backfill is not None:
+                sync_conn.execute(table.update().values({column: backfill}))
+
+
+def _dedupe_checkins(sync_conn) -> None:
+    """
+    Remove duplicate check-ins so ``ix_checkin_task_date`` can be built unique.
+    
+    Older versions declared the index non-unique or not at all, and their
+    read-then-insert check-in could store the same task and day twice. Runs
+    only while the database lacks the unique index: keeps the record with the
+    lowest id per task and day, logs how many were removed, and drops a
+    non-unique index of the same name so it is rebuilt as unique below.
+    """
+    from app.models.checkin_record import CheckinRecord
+    
+    table = CheckinRecord.__table__
+    existing = {index["name"]: index["unique"] for index in inspect(sync_conn).get_indexes(table.name)}
+    if existing.get(CHECKIN_UNIQUE_INDEX):
+        return
+    
+    kept = select(func.min(table.c.id)).group_by(table.c.task_id, table.c.checkin_date)
+    result = sync_conn.execute(table.delete().where(table.c.id.not_in(kept)))
+    if result.rowcount:
+        logger.warning(
+            "Removed %d duplicate check-in records before building %s",
+            result.rowcount, CHECKIN_UNIQUE_INDEX,
+        )
+    if CHECKIN_UNIQUE_INDEX in existing:
+        sync_conn.exec_driver_sql(
+            f"DROP INDEX {sync_conn.dialect.identifier_preparer.quote(CHECKIN_UNIQUE_INDEX)}"
+        )
+
+
+def _create_schema(sync_conn) -> None:
+    preparer = sync_conn.dialect.identifier_preparer
+    Base.metadata.create_all(sync_conn)
+    _add_missing_columns(sync_conn)
+    for name in OBSOLETE_INDEXES:
+        sync_conn.exec_driver_sql(f"DROP INDEX IF EXISTS {preparer.quote(name)}")
+    _dedupe_checkins(sync_conn)
+    # create_all skips the indexes of tables that already exist, so databases
+    # created by an older version get newly declared indexes here. IF NOT EXISTS
+    # rather than checkfirst: reflection does not report expression indexes
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            sync_conn.execute(CreateIndex(index, if_not_exists=True))
+
+
 async def init_db():
     from app import models  # noqa: F401
     async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_create_schema)
+        # Refresh the planner statistics so the query planner picks the indexes
+        await conn.exec_driver_sql("ANALYZE")
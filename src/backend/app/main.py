@@ -1,10 +1,13 @@
 import os
+import sys
 import logging
-from fastapi import FastAPI
+import orjson
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api import lists, tasks, life_entries, stats, settings, notifications
 from app.database import init_db
+from app.utils.responses import ORJSONResponse
 
 # Configure logging for better diagnostics
 logging.basicConfig(
@@ -17,7 +20,8 @@ logger = logging.getLogger('lifeflow')
 app = FastAPI(
     title="LifeFlow API",
     description="LifeFlow Backend API for task, habit, and life management",
-    version="0.2.0"
+    version="0.2.0",
+    default_response_class=ORJSONResponse,
 )
 
 # CORS configuration - allow all origins for Electron app compatibility
@@ -74,25 +78,31 @@ async def shutdown():
     logger.info("LifeFlow Backend shutting down")
 
 
+# Health and diagnostics report values fixed at startup; they are polled by
+# monitors, so the JSON bodies are encoded once and reused
+HEALTH_BODY = orjson.dumps({
+    "status": "healthy",
+    "version": "0.2.0",
+    "packaged": is_packaged,
+})
+
+DIAGNOSTICS_BODY = orjson.dumps({
+    "status": "ok",
+    "python_version": sys.version,
+    "frozen": getattr(sys, 'frozen', False),
+    "database_path": os.environ.get('LIFEFLOW_DATABASE_PATH', 'not set'),
+    "packaged": is_packaged,
+    "cors_origins": "*" if is_packaged else allowed_origins,
+})
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint for monitoring backend status."""
-    return {
-        "status": "healthy",
-        "version": "0.2.0",
-        "packaged": is_packaged,
-    }
+    return Response(content=HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/api/diagnostics")
 async def diagnostics():
     """Diagnostics endpoint for debugging connection issues."""
-    import sys
-    return {
-        "status": "ok",
-        "python_version": sys.version,
-        "frozen": getattr(sys, 'frozen', False),
-        "database_path": os.environ.get('LIFEFLOW_DATABASE_PATH', 'not set'),
-        "packaged": is_packaged,
-        "cors_origins": "*" if is_packaged else allowed_origins,
-    }
+    return Response(content=DIAGNOSTICS_BODY, media_type="application/json")
@@ -1,8 +1,13 @@
 from datetime import datetime
+from typing import List, TYPE_CHECKING
 from sqlalchemy import String, Integer, DateTime
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.utils.clock import utc_now
+
+if TYPE_CHECKING:
+    from app.models.task_card import TaskCard
 
 
 class CardList(Base):
@@ -12,4 +17,11 @@ class CardList(Base):
     name: Mapped[str] = mapped_column(String, nullable=False)
     color: Mapped[str] = mapped_column(String, default="#3B82F6")
     sort_order: Mapped[int] = mapped_column(Integer, default=0)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+
+    # lazy="raise": touching an unloaded collection is an error instead of a
+    # hidden per-row SELECT; load it explicitly with selectinload() when needed.
+    # passive_deletes leaves the tasks untouched when a list is deleted.
+    tasks: Mapped[List["TaskCard"]] = relationship(
+        back_populates="card_list", lazy="raise", passive_deletes=True
+    )
@@ -1,8 +1,13 @@
 from datetime import datetime, date
-from sqlalchemy import String, DateTime, Date, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from typing import TYPE_CHECKING
+from sqlalchemy import String, DateTime, Date, ForeignKey, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.utils.clock import utc_now
+
+if TYPE_CHECKING:
+    from app.models.task_card import TaskCard
 
 
 class CheckinRecord(Base):
@@ -11,4 +16,12 @@ class CheckinRecord(Base):
     id: Mapped[str] = mapped_column(String, primary_key=True)
     task_id: Mapped[str] = mapped_column(String, ForeignKey("task_cards.id"))
     checkin_date: Mapped[date] = mapped_column(Date, nullable=False)
-    checkin_time: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    checkin_time: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+
+    task: Mapped["TaskCard"] = relationship(back_populates="checkins", lazy="raise")
+
+    __table_args__ = (
+        # Per-task, per-day lookups (daily ring EXISTS, check-in duplicate probe);
+        # unique so a task can only be checked in once per day
+        Index("ix_checkin_task_date", "task_id", "checkin_date", unique=True),
+    )
@@ -1,9 +1,10 @@
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import String, DateTime, Boolean, Text, JSON
+from sqlalchemy import String, DateTime, Boolean, Text, JSON, Integer, Index, column, func, text
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.database import Base
+from app.utils.clock import utc_now
 
 
 class Notification(Base):
@@ -16,5 +17,23 @@ class Notification(Base):
     message: Mapped[str] = mapped_column(Text, default="")
     data: Mapped[Optional[dict]] = mapped_column(JSON, nullable=True)  # 额外数据 (habit_id, streak, etc.)
     is_read: Mapped[bool] = mapped_column(Boolean, default=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
     user_id: Mapped[str] = mapped_column(String, default="default")  # 预留多用户支持
+    # 从 data 中冗余出来的查询字段；info["backfill"] 用于给旧数据库补列时回填
+    related_habit_id: Mapped[Optional[str]] = mapped_column(
+        String, nullable=True, info={"backfill": func.json_extract(column("data"), "$.habit_id")}
+    )
+    milestone: Mapped[Optional[int]] = mapped_column(
+        Integer, nullable=True, info={"backfill": func.json_extract(column("data"), "$.milestone")}
+    )
+
+    __table_args__ = (
+        # 键集分页：ORDER BY created_at DESC, id DESC
+        Index("ix_notification_created_id", created_at.desc(), id.desc()),
+        # 按类型查当日通知（当日提醒、每日完成）
+        Index("ix_notification_type_created", "type", "created_at"),
+        # 成就去重
+        Index("ix_notification_achievement", "type", "related_habit_id", "milestone"),
+        # 未读计数：只索引未读行，COUNT(*) 直接由索引得出
+        Index("ix_notification_unread", "is_read", sqlite_where=text("is_read = 0")),
+    )
@@ -1,9 +1,14 @@
 from datetime import datetime, date
-from typing import Optional
-from sqlalchemy import String, Integer, DateTime, Date, Boolean, Text, ForeignKey
-from sqlalchemy.orm import Mapped, mapped_column
+from typing import List, Optional, TYPE_CHECKING
+from sqlalchemy import String, Integer, DateTime, Date, Boolean, Text, ForeignKey, Index, text
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
+from app.utils.clock import utc_now
+
+if TYPE_CHECKING:
+    from app.models.card_list import CardList
+    from app.models.checkin_record import CheckinRecord
 
 
 class TaskCard(Base):
@@ -18,6 +23,24 @@ class TaskCard(Base):
     current_streak: Mapped[int] = mapped_column(Integer, default=0)
     longest_streak: Mapped[int] = mapped_column(Integer, default=0)
     last_checkin_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=utc_now, onupdate=utc_now)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Relationships never lazy load (see CardList.tasks); use selectinload()/joinedload()
+    card_list: Mapped[Optional["CardList"]] = relationship(back_populates="tasks", lazy="raise")
+    checkins: Mapped[List["CheckinRecord"]] = relationship(
+        back_populates="task", lazy="raise", passive_deletes=True
+    )
+
+    __table_args__ = (
+        # Task listings: active cards only, newest first, optionally within one list.
+        # Partial indexes match the is_deleted = 0 filter and avoid a sort step.
+        Index("ix_task_active_created", created_at.desc(), sqlite_where=text("is_deleted = 0")),
+        Index(
+            "ix_task_list_created",
+            list_id,
+            created_at.desc(),
+            sqlite_where=text("is_deleted = 0"),
+        ),
+    )
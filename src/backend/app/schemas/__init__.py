@@ -1,5 +1,5 @@
 from app.schemas.card_list import CardListCreate, CardListUpdate, CardListResponse
-from app.schemas.task_card import TaskCardCreate, TaskCardUpdate, TaskCardResponse
+from app.schemas.task_card import TaskCardCreate, TaskCardUpdate, TaskCardResponse, TaskCardListItem
 from app.schemas.checkin_record import CheckinRecordCreate, CheckinRecordResponse
 from app.schemas.life_entry import LifeEntryCreate, LifeEntryUpdate, LifeEntryResponse
 from app.schemas.setting import SettingUpdate, SettingResponse, SettingsResponse
@@ -7,7 +7,7 @@ from app.schemas.stats import DailyRingData, StatsOverview
 
 __all__ = [
     "CardListCreate", "CardListUpdate", "CardListResponse",
-    "TaskCardCreate", "TaskCardUpdate", "TaskCardResponse",
+    "TaskCardCreate", "TaskCardUpdate", "TaskCardResponse", "TaskCardListItem",
     "CheckinRecordCreate", "CheckinRecordResponse",
     "LifeEntryCreate", "LifeEntryUpdate", "LifeEntryResponse",
     "SettingUpdate", "SettingResponse", "SettingsResponse",
@@ -21,5 +21,4 @@ class CheckinRecordResponse(BaseModel):
     checkin_date: date
     checkin_time: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
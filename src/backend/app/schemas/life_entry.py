@@ -32,8 +32,7 @@ class LifeEntryResponse(BaseModel):
     updated_at: datetime
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
 
 
 class LifeEntryPaginatedResponse(BaseModel):
@@ -43,6 +42,7 @@ class LifeEntryPaginatedResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
 
 
 class DateGroupedEntries(BaseModel):
@@ -58,3 +58,4 @@ class LifeEntryGroupedResponse(BaseModel):
     page: int
     page_size: int
     total_pages: int
+    next_cursor: Optional[str] = None
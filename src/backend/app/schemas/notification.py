@@ -33,6 +33,7 @@ class NotificationListResponse(BaseModel):
     notifications: List[NotificationResponse]
     total: int
     unread_count: int
+    next_cursor: Optional[str] = None
 
 
 class UnreadCountResponse(BaseModel):
@@ -12,8 +12,7 @@ class SettingResponse(BaseModel):
     value: Optional[str]
     updated_at: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
 
 
 class SettingsResponse(BaseModel):
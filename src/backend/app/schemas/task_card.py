@@ -69,10 +69,10 @@ class TaskCardUpdate(BaseModel):
         return validate_reminder_time(v)
 
 
-class TaskCardResponse(BaseModel):
+class TaskCardListItem(BaseModel):
+    """Task card without its markdown content, for slim list responses."""
     id: str
     title: str
-    content: str
     list_id: Optional[str]
     is_habit: bool
     reminder_time: Optional[datetime]
@@ -83,5 +83,8 @@ class TaskCardResponse(BaseModel):
     updated_at: datetime
     is_deleted: bool
 
-    class Config:
-        from_attributes = True
+    model_config = {"from_attributes": True}
+
+
+class TaskCardResponse(TaskCardListItem):
+    content: str
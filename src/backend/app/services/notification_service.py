@@ -1,18 +1,91 @@
 """
 通知服务 - 处理习惯提醒、成就通知和每日完成通知的生成逻辑
 """
-import uuid
-from datetime import datetime, date
-from typing import List, Optional
+import weakref
+from datetime import datetime, date, timedelta
+from typing import Any, List, Optional, Sequence, Set, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import Date, DateTime, Row, select, and_, or_, bindparam, func, tuple_
 
 from app.models.notification import Notification
 from app.models.task_card import TaskCard
+from app.utils.clock import get_local_date, utc_now
+from app.utils.count_cache import invalidate
+from app.utils.ids import uuid7
 
 
 # 成就里程碑
-ACHIEVEMENT_MILESTONES = [7, 14, 30, 60, 100]
+ACHIEVEMENT_MILESTONES = frozenset({7, 14, 30, 60, 100})
+
+# 生成器用到的习惯字段；只取这几列，提交后也不会因过期而重新加载
+HABIT_COLUMNS = (
+    TaskCard.id,
+    TaskCard.title,
+    TaskCard.current_streak,
+    TaskCard.last_checkin_date,
+)
+
+# 热路径上的固定查询在导入时构建一次，每次只绑定参数执行
+_ACTIVE_HABIT = and_(TaskCard.is_habit == True, TaskCard.is_deleted == False)
+_TODAY = bindparam('today', type_=Date)
+_DAY_START = bindparam('day_start', type_=DateTime)
+_DAY_END = bindparam('day_end', type_=DateTime)
+
+ACTIVE_HABITS_QUERY = select(*HABIT_COLUMNS).where(_ACTIVE_HABIT)
+
+# 今天未打卡且没有连续打卡记录的习惯（普通提醒）
+REMINDER_CANDIDATES_QUERY = select(*HABIT_COLUMNS).where(
+    _ACTIVE_HABIT,
+    or_(TaskCard.last_checkin_date.is_(None), TaskCard.last_checkin_date != _TODAY),
+    TaskCard.current_streak <= 0
+)
+
+# 有连续打卡记录但今天未打卡的习惯（风险提醒）
+AT_RISK_CANDIDATES_QUERY = select(*HABIT_COLUMNS).where(
+    _ACTIVE_HABIT,
+    TaskCard.current_streak > 0,
+    TaskCard.last_checkin_date != _TODAY
+)
+
+# 活跃习惯总数和今日已完成数
+HABIT_COMPLETION_QUERY = select(
+    func.count().label('total'),
+    func.count().filter(TaskCard.last_checkin_date == _TODAY).label('completed')
+).where(_ACTIVE_HABIT)
+
+# 今日已生成的提醒 (habit_id, at_risk)；at_risk 由 SQLite 的 json_extract 取出，不必反序列化整个 data
+TODAY_REMINDERS_QUERY = select(
+    Notification.related_habit_id,
+    func.coalesce(func.json_extract(Notification.data, '$.at_risk'), 0)
+).where(
+    Notification.type == 'habit_reminder',
+    Notification.created_at >= _DAY_START,
+    Notification.created_at < _DAY_END,
+    Notification.related_habit_id.is_not(None)
+)
+
+# 普通列比较，走 ix_notification_achievement
+ACHIEVEMENT_EXISTS_QUERY = select(Notification.id).where(
+    Notification.type == 'achievement',
+    Notification.related_habit_id == bindparam('habit_id'),
+    Notification.milestone == bindparam('milestone')
+).limit(1)
+
+DAILY_COMPLETE_EXISTS_QUERY = select(Notification.id).where(
+    Notification.type == 'daily_complete',
+    Notification.created_at >= _DAY_START,
+    Notification.created_at < _DAY_END
+).limit(1)
+
+# 已确认存在的成就通知 engine -> (日期, {(habit_id, milestone)})，跨天清空
+_achievements_seen: "weakref.WeakKeyDictionary[Any, Tuple[date, Set[Tuple[str, int]]]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def clear_seen_achievements() -> None:
+    """清空已确认成就的缓存；数据库回滚或被替换后调用，避免缓存记住已不存在的通知"""
+    _achievements_seen.clear()
 
 
 class NotificationService:
@@ -20,30 +93,48 @@ class NotificationService:
     
     def __init__(self, db: AsyncSession):
         self.db = db
+        # 今日已生成的提醒 {(habit_id, at_risk)}，首次用到时一次查出，两个生成器共用
+        self._reminded: Optional[Set[Tuple[str, bool]]] = None
+        # 活跃习惯，首次用到时一次查出，各生成器共用
+        self._habits: Optional[Sequence[Row]] = None
+        # 今天的 UTC 时间窗口，首次用到时计算
+        self._day_window: Optional[Tuple[datetime, datetime]] = None
     
-    async def generate_habit_reminders(self) -> List[Notification]:
+    async def refresh_all(self) -> List[Notification]:
+        """
+        生成今日的全部通知：习惯提醒、风险提醒和每日完成
+        活跃习惯只查询一次，三个生成器共用
+        """
+        habits = await self._load_active_habits()
+        created_notifications = await self.generate_habit_reminders(habits)
+        created_notifications += await self.generate_at_risk_notifications(habits)
+        daily_complete = await self.check_daily_complete(habits=habits)
+        if daily_complete is not None:
+            created_notifications.append(daily_complete)
+        return created_notifications
+    
+    async def generate_habit_reminders(self, habits: Optional[Sequence[Row]] = None) -> List[Notification]:
         """
         生成今日习惯提醒通知
         为所有未完成且没有连续打卡记录的习惯生成提醒
         （有连续打卡记录的由 generate_at_risk_notifications 处理）
+        
+        Args:
+            habits: 已加载的活跃习惯；省略时只查询需要提醒的习惯
         """
         today = date.today()
         
-        # 获取所有活跃的习惯（未删除且是习惯类型）
-        result = await self.db.execute(
-            select(TaskCard).where(
-                and_(
-                    TaskCard.is_habit == True,
-                    TaskCard.is_deleted == False
-                )
-            )
-        )
-        habits = result.scalars().all()
+        # 单独调用时筛选放在 SQL 里，只取需要提醒的习惯
+        if habits is None:
+            result = await self.db.execute(REMINDER_CANDIDATES_QUERY, {'today': today})
+            habits = result.all()
+        
+        reminded = await self._load_reminded()
         
         created_notifications = []
         
         for habit in habits:
-            # 检查今天是否已打卡
+            # 共用的活跃习惯列表未经筛选；检查今天是否已打卡
             if habit.last_checkin_date == today:
                 continue
             
@@ -52,12 +143,11 @@ class NotificationService:
                 continue
             
             # 检查是否已经为这个习惯生成过今日提醒
-            existing = await self._check_existing_reminder(habit.id, today)
-            if existing:
+            if (habit.id, False) in reminded:
                 continue
             
             # 生成提醒通知
-            notification = await self._create_notification(
+            notification = self._build_notification(
                 notification_type='habit_reminder',
                 title=f'习惯提醒: {habit.title}',
                 message=f'别忘了完成今天的「{habit.title}」习惯打卡！',
@@ -65,41 +155,43 @@ class NotificationService:
                     'habit_id': habit.id,
                     'habit_title': habit.title,
                     'current_streak': habit.current_streak
-                }
+                },
+                related_habit_id=habit.id
             )
             created_notifications.append(notification)
+            reminded.add((habit.id, False))
         
+        # 所有提醒一次提交，批量插入
+        await self._save_notifications(created_notifications)
         return created_notifications
     
-    async def generate_at_risk_notifications(self) -> List[Notification]:
+    async def generate_at_risk_notifications(self, habits: Optional[Sequence[Row]] = None) -> List[Notification]:
         """
         生成连续打卡风险提醒
         为有连续打卡记录但今天未打卡的习惯生成警告
+        
+        Args:
+            habits: 已加载的活跃习惯；省略时只查询有风险的习惯
         """
         today = date.today()
         
-        # 获取有连续打卡记录但今天未打卡的习惯
-        result = await self.db.execute(
-            select(TaskCard).where(
-                and_(
-                    TaskCard.is_habit == True,
-                    TaskCard.is_deleted == False,
-                    TaskCard.current_streak > 0,
-                    TaskCard.last_checkin_date != today
-                )
-            )
-        )
-        habits = result.scalars().all()
+        if habits is None:
+            result = await self.db.execute(AT_RISK_CANDIDATES_QUERY, {'today': today})
+            habits = result.all()
+        
+        reminded = await self._load_reminded()
         
         created_notifications = []
         
         for habit in habits:
+            if not self._is_at_risk(habit, today):
+                continue
+            
             # 检查是否已经为这个习惯生成过今日风险提醒
-            existing = await self._check_existing_at_risk(habit.id, today)
-            if existing:
+            if (habit.id, True) in reminded:
                 continue
             
-            notification = await self._create_notification(
+            notification = self._build_notification(
                 notification_type='habit_reminder',
                 title=f'⚠️ 连续打卡即将中断',
                 message=f'「{habit.title}」已连续打卡 {habit.current_streak} 天，今天还没打卡哦！',
@@ -108,12 +200,21 @@ class NotificationService:
                     'habit_title': habit.title,
                     'current_streak': habit.current_streak,
                     'at_risk': True
-                }
+                },
+                related_habit_id=habit.id
             )
             created_notifications.append(notification)
+            reminded.add((habit.id, True))
         
+        # 所有提醒一次提交，批量插入
+        await self._save_notifications(created_notifications)
         return created_notifications
     
+    @staticmethod
+    def _is_at_risk(habit: Row, today: date) -> bool:
+        """有连续打卡记录但今天未打卡的习惯有中断风险"""
+        return habit.current_streak > 0 and habit.last_checkin_date not in (None, today)
+    
     async def check_streak_achievement(
         self, 
         habit_id: str, 
@@ -127,172 +228,226 @@ class NotificationService:
         if streak not in ACHIEVEMENT_MILESTONES:
             return None
         
+        # 本进程今天已确认过的里程碑直接跳过，不再查询数据库
+        seen = self._seen_achievements()
+        key = (habit_id, streak)
+        if key in seen:
+            return None
+        
         # 检查是否已经为这个里程碑生成过通知
         existing = await self._check_existing_achievement(habit_id, streak)
         if existing:
+            seen.add(key)
             return None
         
-        notification = await self._create_notification(
-            notification_type='achievement',
-            title=f'🎉 成就解锁！',
-            message=f'恭喜！「{habit_title}」已连续打卡 {streak} 天！',
-            data={
-                'habit_id': habit_id,
-                'habit_title': habit_title,
-                'streak': streak,
-                'milestone': streak
-            }
-        )
+        notification = self._build_achievement(habit_id, streak, habit_title)
+        await self._save_notifications([notification])
+        seen.add(key)
         
         return notification
     
-    async def check_daily_complete(self) -> Optional[Notification]:
+    async def check_streak_achievements(
+        self,
+        achievements: Sequence[Tuple[str, int, str]]
+    ) -> List[Notification]:
         """
-        检查是否完成所有习惯并生成通知
+        批量检查并生成成就通知
+        一次查询已有的 (habit_id, milestone)，新通知一次提交
+        
+        Args:
+            achievements: [(habit_id, streak, habit_title), ...]
         """
-        today = date.today()
+        seen = self._seen_achievements()
+        candidates = {}
+        for habit_id, streak, habit_title in achievements:
+            key = (habit_id, streak)
+            if streak in ACHIEVEMENT_MILESTONES and key not in seen:
+                candidates.setdefault(key, habit_title)
+        
+        if not candidates:
+            return []
         
-        # 获取所有活跃习惯
         result = await self.db.execute(
-            select(TaskCard).where(
-                and_(
-                    TaskCard.is_habit == True,
-                    TaskCard.is_deleted == False
-                )
+            select(Notification.related_habit_id, Notification.milestone).where(
+                Notification.type == 'achievement',
+                tuple_(Notification.related_habit_id, Notification.milestone).in_(list(candidates))
             )
         )
-        habits = result.scalars().all()
+        existing = {tuple(row) for row in result}
+        seen.update(existing)
         
-        if not habits:
-            return None
+        created_notifications = [
+            self._build_achievement(habit_id, streak, habit_title)
+            for (habit_id, streak), habit_title in candidates.items()
+            if (habit_id, streak) not in existing
+        ]
+        await self._save_notifications(created_notifications)
+        seen.update(candidates)
+        return created_notifications
+    
+    async def check_daily_complete(
+        self,
+        today: Optional[date] = None,
+        habits: Optional[Sequence[Row]] = None
+    ) -> Optional[Notification]:
+        """
+        检查是否完成所有习惯并生成通知
+        
+        Args:
+            today: 调用方已算好的用户本地日期；省略时使用服务器日期
+            habits: 已加载的活跃习惯；省略时用聚合查询统计
+        """
+        if today is None:
+            today = date.today()
         
-        # 检查是否所有习惯都已完成
-        all_completed = all(habit.last_checkin_date == today for habit in habits)
+        if habits is not None:
+            total = len(habits)
+            completed = sum(1 for habit in habits if habit.last_checkin_date == today)
+        else:
+            # 一条聚合查询统计活跃习惯总数和今日已完成数，不加载习惯行
+            result = await self.db.execute(HABIT_COMPLETION_QUERY, {'today': today})
+            total, completed = result.one()
         
-        if not all_completed:
+        # 没有习惯，或还有习惯未完成
+        if not total or completed != total:
             return None
         
         # 检查今天是否已经生成过完成通知
-        existing = await self._check_existing_daily_complete(today)
+        existing = await self._check_existing_daily_complete()
         if existing:
             return None
         
         notification = await self._create_notification(
             notification_type='daily_complete',
             title=f'🌟 今日习惯全部完成！',
-            message=f'太棒了！你已完成今天的所有 {len(habits)} 个习惯！',
+            message=f'太棒了！你已完成今天的所有 {total} 个习惯！',
             data={
-                'completed_count': len(habits),
+                'completed_count': total,
                 'date': today.isoformat()
             }
         )
         
         return notification
     
-    async def _create_notification(
+    def _build_achievement(self, habit_id: str, streak: int, habit_title: str) -> Notification:
+        """构建成就通知"""
+        return self._build_notification(
+            notification_type='achievement',
+            title=f'🎉 成就解锁！',
+            message=f'恭喜！「{habit_title}」已连续打卡 {streak} 天！',
+            data={
+                'habit_id': habit_id,
+                'habit_title': habit_title,
+                'streak': streak,
+                'milestone': streak
+            },
+            related_habit_id=habit_id,
+            milestone=streak
+        )
+    
+    async def _load_active_habits(self) -> Sequence[Row]:
+        """活跃习惯（未删除且是习惯类型），同一个服务实例只查询一次"""
+        if self._habits is None:
+            result = await self.db.execute(ACTIVE_HABITS_QUERY)
+            self._habits = result.all()
+        return self._habits
+    
+    def _seen_achievements(self) -> Set[Tuple[str, int]]:
+        """当前数据库今天已确认存在的成就 {(habit_id, milestone)}"""
+        # 与打卡使用同一个时钟
+        today = get_local_date()
+        engine = self.db.bind.sync_engine
+        cached = _achievements_seen.get(engine)
+        if cached is None or cached[0] != today:
+            cached = (today, set())
+            _achievements_seen[engine] = cached
+        return cached[1]
+    
+    def _build_notification(
         self,
         notification_type: str,
         title: str,
         message: str,
-        data: dict = None
+        data: dict = None,
+        related_habit_id: Optional[str] = None,
+        milestone: Optional[int] = None
     ) -> Notification:
-        """创建并保存通知"""
-        notification = Notification(
-            id=str(uuid.uuid4()),
+        """构建通知对象（不写入数据库）"""
+        return Notification(
+            id=uuid7(),
             type=notification_type,
             title=title,
             message=message,
             data=data,
             is_read=False,
-            created_at=datetime.utcnow(),
-            user_id="default"
+            created_at=utc_now(),
+            user_id="default",
+            related_habit_id=related_habit_id,
+            milestone=milestone
         )
-        self.db.add(notification)
+    
+    async def _save_notifications(self, notifications: List[Notification]) -> None:
+        """在一次提交中保存一批通知（ORM 合并为一条多行 INSERT）"""
+        if not notifications:
+            return
+        self.db.add_all(notifications)
         await self.db.commit()
-        await self.db.refresh(notification)
-        return notification
+        invalidate(Notification.__tablename__)
     
-    async def _check_existing_reminder(self, habit_id: str, today: date) -> bool:
-        """检查今天是否已为该习惯生成过提醒"""
-        # 使用 UTC 时间范围，与 created_at 保持一致
-        from datetime import timezone, timedelta
-        utc_now = datetime.now(timezone.utc)
-        # 获取今天 UTC 00:00 到明天 UTC 00:00
-        start_of_day_utc = datetime(utc_now.year, utc_now.month, utc_now.day, 0, 0, 0)
-        end_of_day_utc = start_of_day_utc + timedelta(days=1)
-        
-        result = await self.db.execute(
-            select(Notification).where(
-                and_(
-                    Notification.type == 'habit_reminder',
-                    Notification.created_at >= start_of_day_utc,
-                    Notification.created_at < end_of_day_utc
-                )
-            )
+    async def _create_notification(
+        self,
+        notification_type: str,
+        title: str,
+        message: str,
+        data: dict = None,
+        related_habit_id: Optional[str] = None,
+        milestone: Optional[int] = None
+    ) -> Notification:
+        """创建并保存通知（ID 与时间戳都在客户端生成，提交后无需 refresh）"""
+        notification = self._build_notification(
+            notification_type, title, message, data, related_habit_id, milestone
         )
-        notifications = result.scalars().all()
-        
-        for n in notifications:
-            if n.data and n.data.get('habit_id') == habit_id and not n.data.get('at_risk'):
-                return True
-        return False
+        await self._save_notifications([notification])
+        return notification
+    
+    def _utc_day_window(self) -> Tuple[datetime, datetime]:
+        """今天 UTC 00:00 到明天 UTC 00:00，与 created_at 保持一致；同一个服务实例只计算一次"""
+        if self._day_window is None:
+            now = utc_now()
+            start_of_day_utc = datetime(now.year, now.month, now.day)
+            self._day_window = (start_of_day_utc, start_of_day_utc + timedelta(days=1))
+        return self._day_window
     
-    async def _check_existing_at_risk(self, habit_id: str, today: date) -> bool:
-        """检查今天是否已为该习惯生成过风险提醒"""
-        from datetime import timezone, timedelta
-        utc_now = datetime.now(timezone.utc)
-        start_of_day_utc = datetime(utc_now.year, utc_now.month, utc_now.day, 0, 0, 0)
-        end_of_day_utc = start_of_day_utc + timedelta(days=1)
+    async def _load_reminded(self) -> Set[Tuple[str, bool]]:
+        """
+        今天已生成过的提醒 {(habit_id, at_risk)}
+        
+        同一个服务实例只查询一次，之后新生成的提醒直接加入集合
+        """
+        if self._reminded is not None:
+            return self._reminded
         
+        start_of_day_utc, end_of_day_utc = self._utc_day_window()
         result = await self.db.execute(
-            select(Notification).where(
-                and_(
-                    Notification.type == 'habit_reminder',
-                    Notification.created_at >= start_of_day_utc,
-                    Notification.created_at < end_of_day_utc
-                )
-            )
+            TODAY_REMINDERS_QUERY,
+            {'day_start': start_of_day_utc, 'day_end': end_of_day_utc}
         )
-        notifications = result.scalars().all()
-        
-        for n in notifications:
-            if n.data and n.data.get('habit_id') == habit_id and n.data.get('at_risk'):
-                return True
-        return False
+        self._reminded = {(row[0], bool(row[1])) for row in result}
+        return self._reminded
     
     async def _check_existing_achievement(self, habit_id: str, milestone: int) -> bool:
         """检查是否已为该习惯的该里程碑生成过成就通知"""
         # 只查询该习惯的成就通知，而不是所有成就
-        from sqlalchemy import text
-        
-        # 使用 SQLite 的 json_extract 函数进行高效查询
         result = await self.db.execute(
-            select(Notification).where(
-                and_(
-                    Notification.type == 'achievement',
-                    text(f"json_extract(data, '$.habit_id') = :habit_id"),
-                    text(f"json_extract(data, '$.milestone') = :milestone")
-                )
-            ).params(habit_id=habit_id, milestone=milestone).limit(1)
+            ACHIEVEMENT_EXISTS_QUERY, {'habit_id': habit_id, 'milestone': milestone}
         )
-        notification = result.scalar_one_or_none()
-        return notification is not None
+        return result.scalar_one_or_none() is not None
     
-    async def _check_existing_daily_complete(self, today: date) -> bool:
+    async def _check_existing_daily_complete(self) -> bool:
         """检查今天是否已生成过每日完成通知"""
-        from datetime import timezone, timedelta
-        utc_now = datetime.now(timezone.utc)
-        start_of_day_utc = datetime(utc_now.year, utc_now.month, utc_now.day, 0, 0, 0)
-        end_of_day_utc = start_of_day_utc + timedelta(days=1)
-        
+        start_of_day_utc, end_of_day_utc = self._utc_day_window()
         result = await self.db.execute(
-            select(Notification).where(
-                and_(
-                    Notification.type == 'daily_complete',
-                    Notification.created_at >= start_of_day_utc,
-                    Notification.created_at < end_of_day_utc
-                )
-            )
+            DAILY_COMPLETE_EXISTS_QUERY,
+            {'day_start': start_of_day_utc, 'day_end': end_of_day_utc}
         )
-        notification = result.scalar_one_or_none()
-        return notification is not None
+        return result.scalar_one_or_none() is not None
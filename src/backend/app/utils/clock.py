@@ -0,0 +1,38 @@
+"""Time helpers"""
+import time
+from datetime import date, datetime, timezone
+
+# Bound once so the hot path skips the attribute lookup on ``timezone``
+UTC = timezone.utc
+
+# Proleptic ordinal of 1970-01-01, the day Unix time counts from
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def utc_now() -> datetime:
+    """
+    Current time as a naive UTC datetime.
+
+    SQLite ``DateTime`` columns drop tzinfo, so this is the exact form every
+    stored timestamp is read back in. Objects returned straight from memory
+    after a commit (without a refresh) then serialize the same way as rows
+    loaded from the database.
+    """
+    return datetime.now(UTC).replace(tzinfo=None)
+
+
+def get_local_date(timezone_offset_minutes: int = 0) -> date:
+    """
+    Get the current date in the user's local timezone.
+    
+    Args:
+        timezone_offset_minutes: Offset from UTC in minutes.
+            Positive values are west of UTC (e.g., 300 for UTC-5).
+            Negative values are east of UTC (e.g., -480 for UTC+8).
+    
+    Returns:
+        The current date in the user's local timezone.
+    """
+    # Whole days since the epoch in local time; no datetime/timedelta objects needed
+    days = int((time.time() - timezone_offset_minutes * 60) // 86400)
+    return date.fromordinal(EPOCH_ORDINAL + days)
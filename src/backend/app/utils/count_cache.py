@@ -0,0 +1,63 @@
+"""
+Short-lived cache for COUNT(*) queries.
+
+Paginated listings re-count their table on every request even though the
+total rarely changes between two page loads. Counts are cached per engine for
+``COUNT_CACHE_TTL`` seconds; write endpoints call ``invalidate(table)`` so a
+change is visible on the very next read instead of after the TTL.
+"""
+import time
+import weakref
+from collections import defaultdict
+from typing import Any, Dict, Tuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+# Seconds a cached count stays valid
+COUNT_CACHE_TTL = 5.0
+
+# engine -> {key: (table version, expires_at, count)}
+_cache: "weakref.WeakKeyDictionary[Any, Dict[str, Tuple[int, float, int]]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Bumped on every write to a table; entries recorded under an older version are stale
+_versions: Dict[str, int] = defaultdict(int)
+
+
+def invalidate(table: str) -> None:
+    """Mark every cached count for ``table`` as stale."""
+    _versions[table] += 1
+
+
+async def cached_count(
+    db: AsyncSession,
+    table: str,
+    key: str,
+    stmt: Any,
+    ttl: float = COUNT_CACHE_TTL,
+) -> int:
+    """
+    Return the scalar result of the count statement ``stmt``, reusing a cached value.
+
+    Args:
+        db: Database session; counts are cached separately per engine.
+        table: Table the count reads from, used for invalidation.
+        key: Identifies the filter applied by ``stmt`` (e.g. "active").
+        stmt: A SELECT returning a single integer.
+        ttl: Seconds the value may be reused.
+    """
+    engine_cache = _cache.setdefault(db.bind.sync_engine, {})
+    cache_key = f"{table}:{key}"
+    version = _versions[table]
+    now = time.monotonic()
+
+    cached = engine_cache.get(cache_key)
+    if cached is not None and cached[0] == version and cached[1] > now:
+        return cached[2]
+
+    result = await db.execute(stmt)
+    count = result.scalar() or 0
+    # Only store the value if no write landed while the query was in flight
+    if _versions[table] == version:
+        engine_cache[cache_key] = (version, now + ttl, count)
+    return count
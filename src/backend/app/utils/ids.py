@@ -0,0 +1,39 @@
+"""
+Primary key generation.
+
+UUIDv7 (RFC 9562) puts a millisecond Unix timestamp in the high 48 bits, so
+new keys sort after existing ones: inserts append to the end of the primary
+key B-tree instead of splitting random pages, and ``id`` orders rows by
+creation time. Within one millisecond a 12-bit counter keeps keys monotonic.
+"""
+import os
+import threading
+import time
+import uuid
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> str:
+    """Return a new time-ordered UUIDv7 in canonical 36-character form."""
+    global _last_ms, _counter
+
+    with _lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            # Random start leaves headroom below 0xFFF for keys in the same millisecond
+            _counter = int.from_bytes(os.urandom(2), "big") & 0x7FF
+        else:
+            ms = _last_ms
+            _counter += 1
+            if _counter > 0xFFF:
+                ms += 1
+                _counter = 0
+        _last_ms = ms
+        counter = _counter
+
+    rand_b = int.from_bytes(os.urandom(8), "big") & 0x3FFF_FFFF_FFFF_FFFF
+    value = (ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand_b
+    return str(uuid.UUID(int=value))
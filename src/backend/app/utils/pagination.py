@@ -0,0 +1,37 @@
+"""
+Keyset pagination helpers.
+
+Cursors are opaque, URL-safe base64 strings wrapping the ``(created_at, id)``
+of the last row on the previous page. Listing endpoints order by
+``created_at DESC, id DESC`` and fetch rows strictly "below" the cursor, so
+deep pages cost O(page_size) instead of O(offset).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Tuple
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(created_at: datetime, row_id: str) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    payload = json.dumps({"created_at": created_at.isoformat(), "id": row_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(payload["created_at"]), str(payload["id"])
+    except (ValueError, KeyError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
@@ -0,0 +1,17 @@
+"""Response classes"""
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson.
+
+    orjson encodes datetime/date/UUID values in C, which is where most of the
+    serialization time goes for task, check-in and notification payloads.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
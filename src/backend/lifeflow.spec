@@ -33,6 +33,8 @@ a = Analysis(
         'uvicorn.logging',
         'uvicorn.loops',
         'uvicorn.loops.auto',
+        'uvicorn.loops.asyncio',
+        'uvicorn.loops.uvloop',
         'uvicorn.protocols',
         'uvicorn.protocols.http',
         'uvicorn.protocols.http.auto',
@@ -50,10 +52,12 @@ a = Analysis(
         'pydantic_settings',
         'pydantic.deprecated.decorator',
         # HTTP and async
+        'uvloop',
         'httptools',
         'websockets',
         'watchfiles',
         'python_multipart',
+        'orjson',
         # Email validator (pydantic dependency)
         'email_validator',
         # Typing extensions
@@ -71,6 +75,12 @@ a = Analysis(
         'app.api.settings',
         'app.models',
         'app.schemas',
+        'app.utils',
+        'app.utils.clock',
+        'app.utils.count_cache',
+        'app.utils.ids',
+        'app.utils.pagination',
+        'app.utils.responses',
     ],
     hookspath=[],
     hooksconfig={},
@@ -89,13 +89,33 @@ def setup_environment(db_path: str | None = None, is_packaged: bool = False):
 
 
 def check_port_available(host: str, port: int) -> bool:
-    """Check if a port is available for binding."""
+    """
+    Check that nothing is listening on the port yet.
+    
+    Probes with a connect instead of binding and releasing the port, so the
+    check does not hold the port while uvicorn is about to bind it; a refused
+    connection comes back immediately.
+    """
+    # A wildcard address cannot be connected to on every platform
+    probe_host = "127.0.0.1" if host in ("", "0.0.0.0") else host
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(0.05)
+        return s.connect_ex((probe_host, port)) != 0
+
+
+def select_event_loop() -> str:
+    """Pick the event loop implementation for uvicorn.
+    
+    uvloop is used when it is installed and supported (not on Windows);
+    otherwise the standard asyncio loop.
+    """
+    if sys.platform == 'win32':
+        return "asyncio"
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind((host, port))
-            return True
-    except OSError:
-        return False
+        import uvloop  # noqa: F401
+    except ImportError:
+        return "asyncio"
+    return "uvloop"
 
 
 def print_startup_banner(host: str, port: int, is_frozen: bool):
@@ -175,6 +195,9 @@ def main():
     if args.reload and is_frozen:
         log("Warning: --reload is not available in packaged mode", "WARN")
     
+    loop = select_event_loop()
+    log(f"Event loop: {loop}")
+    
     log(f"Starting uvicorn server on {args.host}:{args.port}...")
     
     # Create uvicorn config and server for better shutdown control
@@ -183,6 +206,7 @@ def main():
         host=args.host,
         port=args.port,
         reload=reload_enabled,
+        loop=loop,
         log_level="info",
     )
     server = uvicorn.Server(config)
@@ -39,11 +39,27 @@ def get_db_path():
 DB_PATH = str(get_db_path())
 print(f"📂 使用数据库: {DB_PATH}")
 
+# Random bytes are read for a batch of ids at once instead of one read per uuid4()
+UUID_BATCH_SIZE = 256
+_uuid_pool = []
+
 def generate_uuid():
-    return str(uuid.uuid4())
+    if not _uuid_pool:
+        buf = os.urandom(16 * UUID_BATCH_SIZE)
+        _uuid_pool.extend(
+            str(uuid.UUID(bytes=buf[i:i + 16], version=4)) for i in range(0, len(buf), 16)
+        )
+    return _uuid_pool.pop()
 
 def seed_database():
+    # One generator instance for the whole run instead of the module-level functions
+    rng = random.Random()
+    
     conn = sqlite3.connect(DB_PATH)
+    # Same journal settings as the app engine: WAL without an fsync per commit
+    conn.executescript(
+        "PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL; PRAGMA temp_store=MEMORY;"
+    )
     cursor = conn.cursor()
     
     # Clear existing data (optional - comment out if you want to keep existing data)
@@ -79,23 +95,28 @@ def seed_database():
     
     habit_ids = []
     habit_last_checkins = {}  # Store last checkin date for each habit
+    habit_rows = []
     
     for title, content, list_id, current_streak, longest_streak in habits:
         habit_id = generate_uuid()
         habit_ids.append(habit_id)
         
         # Some habits checked in today, some yesterday
-        last_checkin = today if random.random() > 0.3 else today - timedelta(days=1)
+        last_checkin = today if rng.random() > 0.3 else today - timedelta(days=1)
         habit_last_checkins[habit_id] = last_checkin
         
-        cursor.execute(
-            """INSERT INTO task_cards 
-               (id, title, content, list_id, is_habit, current_streak, longest_streak, 
-                last_checkin_date, created_at, updated_at, is_deleted)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        habit_rows.append(
             (habit_id, title, content, list_id, True, current_streak, longest_streak,
              last_checkin.isoformat(), now.isoformat(), now.isoformat(), False)
         )
+    
+    cursor.executemany(
+        """INSERT INTO task_cards 
+           (id, title, content, list_id, is_habit, current_streak, longest_streak, 
+            last_checkin_date, created_at, updated_at, is_deleted)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        habit_rows
+    )
     print(f"✓ 插入 {len(habits)} 个习惯任务")
 
     
@@ -108,57 +129,50 @@ def seed_database():
         ("购买生活用品", "牙膏、洗发水、纸巾", lists[2][0]),
     ]
     
-    for title, content, list_id in tasks:
-        task_id = generate_uuid()
-        cursor.execute(
-            """INSERT INTO task_cards 
-               (id, title, content, list_id, is_habit, current_streak, longest_streak,
-                created_at, updated_at, is_deleted)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
-            (task_id, title, content, list_id, False, 0, 0,
-             now.isoformat(), now.isoformat(), False)
-        )
+    cursor.executemany(
+        """INSERT INTO task_cards 
+           (id, title, content, list_id, is_habit, current_streak, longest_streak,
+            created_at, updated_at, is_deleted)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+        [(generate_uuid(), title, content, list_id, False, 0, 0,
+          now.isoformat(), now.isoformat(), False)
+         for title, content, list_id in tasks]
+    )
     print(f"✓ 插入 {len(tasks)} 个普通任务")
     
     # ========== Checkin Records ==========
     # Generate check-in records for the past 60 days
-    checkin_count = 0
+    checkin_rows = []
     for habit_id in habit_ids:
         # Random number of check-ins in the past 60 days
-        num_checkins = random.randint(20, 50)
-        checkin_dates = set()
+        num_checkins = rng.randint(20, 50)
         
         # First, ensure we have a checkin record for the last_checkin_date
         last_checkin = habit_last_checkins[habit_id]
-        checkin_dates.add(last_checkin)
         checkin_id = generate_uuid()
-        checkin_time = datetime.combine(last_checkin, datetime.min.time()) + timedelta(hours=random.randint(6, 22))
-        cursor.execute(
-            """INSERT INTO checkin_records (id, task_id, checkin_date, checkin_time)
-               VALUES (?, ?, ?, ?)""",
+        checkin_time = datetime.combine(last_checkin, datetime.min.time()) + timedelta(hours=rng.randint(6, 22))
+        checkin_rows.append(
             (checkin_id, habit_id, last_checkin.isoformat(), checkin_time.isoformat())
         )
-        checkin_count += 1
         
-        # Then add random historical check-ins
-        for _ in range(num_checkins - 1):
-            days_ago = random.randint(1, 60)  # Start from 1 to avoid today if already added
+        # Then add random historical check-ins on distinct days, drawn in one
+        # call instead of retrying until a day not used yet comes up
+        candidate_days = [d for d in range(1, 61) if today - timedelta(days=d) != last_checkin]
+        for days_ago in rng.sample(candidate_days, num_checkins - 1):
             checkin_date = today - timedelta(days=days_ago)
-            
-            # Avoid duplicate dates for same habit
-            if checkin_date not in checkin_dates:
-                checkin_dates.add(checkin_date)
-                checkin_id = generate_uuid()
-                checkin_time = datetime.combine(checkin_date, datetime.min.time()) + timedelta(hours=random.randint(6, 22))
-                
-                cursor.execute(
-                    """INSERT INTO checkin_records (id, task_id, checkin_date, checkin_time)
-                       VALUES (?, ?, ?, ?)""",
-                    (checkin_id, habit_id, checkin_date.isoformat(), checkin_time.isoformat())
-                )
-                checkin_count += 1
-    
-    print(f"✓ 插入 {checkin_count} 条打卡记录")
+            checkin_id = generate_uuid()
+            checkin_time = datetime.combine(checkin_date, datetime.min.time()) + timedelta(hours=rng.randint(6, 22))
+            checkin_rows.append(
+                (checkin_id, habit_id, checkin_date.isoformat(), checkin_time.isoformat())
+            )
+    
+    # One executemany for all check-ins instead of a statement per row
+    cursor.executemany(
+        """INSERT INTO checkin_records (id, task_id, checkin_date, checkin_time)
+           VALUES (?, ?, ?, ?)""",
+        checkin_rows
+    )
+    print(f"✓ 插入 {len(checkin_rows)} 条打卡记录")
     
     # ========== Life Entries ==========
     life_entries = [
@@ -179,15 +193,19 @@ def seed_database():
         ("今天天气不好，在家看了一部好电影。", 14),
     ]
     
+    entry_rows = []
     for content, days_ago in life_entries:
         entry_id = generate_uuid()
-        entry_time = now - timedelta(days=days_ago, hours=random.randint(0, 12))
-        
-        cursor.execute(
-            """INSERT INTO life_entries (id, content, created_at, updated_at, is_deleted)
-               VALUES (?, ?, ?, ?, ?)""",
+        entry_time = now - timedelta(days=days_ago, hours=rng.randint(0, 12))
+        entry_rows.append(
             (entry_id, content, entry_time.isoformat(), entry_time.isoformat(), False)
         )
+    
+    cursor.executemany(
+        """INSERT INTO life_entries (id, content, created_at, updated_at, is_deleted)
+           VALUES (?, ?, ?, ?, ?)""",
+        entry_rows
+    )
     print(f"✓ 插入 {len(life_entries)} 条生活记录")
     
     conn.commit()
@@ -0,0 +1,24 @@
+"""Database helpers shared by the test modules."""
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+@asynccontextmanager
+async def rolled_back_session(engine: AsyncEngine) -> AsyncIterator[AsyncSession]:
+    """
+    Session on the shared test engine whose writes are rolled back afterwards.
+    
+    Commits inside release a SAVEPOINT, so every caller starts from the
+    empty schema without recreating it.
+    """
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        try:
+            async with AsyncSession(
+                bind=conn, expire_on_commit=False, join_transaction_mode="create_savepoint"
+            ) as session:
+                yield session
+        finally:
+            await transaction.rollback()
@@ -1,42 +1,148 @@
-import pytest
+import asyncio
+import sys
+from contextlib import asynccontextmanager
+
 import pytest_asyncio
 from httpx import AsyncClient, ASGITransport
+from hypothesis import settings as hypothesis_settings
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app.database import Base, get_db, get_session_factory
 from app.main import app
+from app.services.notification_service import clear_seen_achievements
+from app.utils.count_cache import invalidate
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
 
+# Property tests hit the database, so example timing varies; tests that need
+# more or fewer examples override max_examples
+hypothesis_settings.register_profile("lifeflow-db", max_examples=50, deadline=None)
+hypothesis_settings.load_profile("lifeflow-db")
 
-@pytest_asyncio.fixture
+# Nothing in the test database has to survive the run: skip durability work
+TEST_SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=OFF",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-65536",
+)
+
+
+if uvloop is not None and sys.platform != "win32":
+    def pytest_asyncio_loop_factories(config, item):
+        # Same loop as run_server uses when uvloop is installed
+        return {"uvloop": uvloop.new_event_loop}
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
 async def test_engine():
-    engine = create_async_engine(TEST_DATABASE_URL, echo=False)
+    # The schema is created once; every test runs inside a transaction that is rolled back
+    # One connection holds the in-memory database, so it must never be replaced
+    engine = create_async_engine(TEST_DATABASE_URL, echo=False, poolclass=StaticPool)
+
+    # The sqlite3 driver defers BEGIN on its own, which breaks SAVEPOINTs;
+    # let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine.sync_engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in TEST_SQLITE_PRAGMAS:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _emit_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield engine
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.drop_all)
     await engine.dispose()
 
 
 @pytest_asyncio.fixture
-async def test_session(test_engine):
-    async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
-    async with async_session() as session:
+async def test_connection(test_engine):
+    async with test_engine.connect() as conn:
+        transaction = await conn.begin()
+        yield conn
+        await transaction.rollback()
+    # The process-level caches still describe the rolled-back writes
+    for table in Base.metadata.tables:
+        invalidate(table)
+    clear_seen_achievements()
+
+
+def _session_factory(conn) -> async_sessionmaker:
+    # Commits inside the code under test release a SAVEPOINT instead of
+    # committing the outer per-test transaction
+    return async_sessionmaker(
+        bind=conn,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        join_transaction_mode="create_savepoint",
+    )
+
+
+@pytest_asyncio.fixture
+async def test_session(test_connection):
+    async with _session_factory(test_connection)() as session:
         yield session
 
 
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def http_client():
+    # One in-process client for the whole run; each test only swaps get_db
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test", timeout=5.0) as ac:
+        yield ac
+
+
 @pytest_asyncio.fixture
-async def client(test_engine):
-    async_session = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+async def client(http_client, test_connection):
+    async_session = _session_factory(test_connection)
+    # Concurrent requests share the test's single connection; nesting their
+    # SAVEPOINTs would release them out of order, so one session at a time
+    connection_lock = asyncio.Lock()
+
+    # Background tasks start while the request's session is still open, but
+    # after it has committed; they only need to take turns among themselves
+    background_lock = asyncio.Lock()
 
     async def override_get_db():
-        async with async_session() as session:
+        async with connection_lock, async_session() as session:
+            yield session
+
+    @asynccontextmanager
+    async def background_session():
+        async with background_lock, async_session() as session:
             yield session
 
     app.dependency_overrides[get_db] = override_get_db
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as ac:
-        yield ac
+    app.dependency_overrides[get_session_factory] = lambda: background_session
+    yield http_client
     app.dependency_overrides.clear()
+
+
+@pytest_asyncio.fixture
+async def task_factory(client):
+    # Tests that only need a task to act on create it here, with a checked status
+    async def make_task(**fields):
+        response = await client.post("/api/tasks", json={"title": "Task", **fields})
+        assert response.status_code == 201
+        return response.json()
+
+    return make_task
+
+
+@pytest_asyncio.fixture
+async def habit_task(task_factory):
+    return await task_factory(title="Morning Exercise", is_habit=True)
@@ -0,0 +1,138 @@
+"""Tests for database schema setup."""
+import pytest
+from sqlalchemy import Index, func, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import _create_schema, make_engine
+from app.models.task_card import TaskCard
+
+
+async def test_create_schema_is_idempotent(tmp_path):
+    """Test that schema setup can run again on an existing database."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    try:
+        for _ in range(2):
+            async with engine.begin() as conn:
+                await conn.run_sync(_create_schema)
+        async with engine.connect() as conn:
+            result = await conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name = 'ix_notification_achievement'"
+            ))
+            assert result.scalar_one_or_none() is not None
+    finally:
+        await engine.dispose()
+
+
+async def test_create_schema_upgrades_notifications(tmp_path):
+    """Test that an older notifications table gets the new columns backfilled and stale indexes dropped."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE notifications (id VARCHAR PRIMARY KEY, type VARCHAR NOT NULL, "
+                "title VARCHAR NOT NULL, message TEXT, data JSON, is_read BOOLEAN, "
+                "created_at DATETIME, user_id VARCHAR)"
+            )
+            await conn.exec_driver_sql(
+                "CREATE INDEX ix_notification_type_habit_milestone "
+                "ON notifications (type, json_extract(data, '$.habit_id'))"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO notifications (id, type, title, data) "
+                "VALUES ('n1', 'achievement', 'a', '{\"habit_id\": \"h1\", \"milestone\": 7}')"
+            )
+
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+
+        async with engine.connect() as conn:
+            row = (await conn.execute(text(
+                "SELECT related_habit_id, milestone FROM notifications WHERE id = 'n1'"
+            ))).one()
+            assert tuple(row) == ("h1", 7)
+            indexes = (await conn.execute(text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = 'notifications'"
+            ))).scalars().all()
+            assert "ix_notification_type_habit_milestone" not in indexes
+            assert "ix_notification_achievement" in indexes
+    finally:
+        await engine.dispose()
+
+
+async def test_create_schema_dedupes_checkins_for_unique_index(tmp_path, caplog):
+    """Test that duplicate check-ins from an older database are removed before the unique index is built."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    try:
+        async with engine.begin() as conn:
+            await conn.exec_driver_sql(
+                "CREATE TABLE checkin_records (id VARCHAR PRIMARY KEY, task_id VARCHAR, "
+                "checkin_date DATE NOT NULL, checkin_time DATETIME)"
+            )
+            await conn.exec_driver_sql(
+                "INSERT INTO checkin_records (id, task_id, checkin_date) VALUES "
+                "('c1', 't1', '2024-01-01'), ('c2', 't1', '2024-01-01'), ('c3', 't1', '2024-01-02')"
+            )
+
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+
+        async with engine.connect() as conn:
+            ids = (await conn.execute(text(
+                "SELECT id FROM checkin_records ORDER BY id"
+            ))).scalars().all()
+            assert ids == ["c1", "c3"]
+            index_sql = (await conn.execute(text(
+                "SELECT sql FROM sqlite_master WHERE name = 'ix_checkin_task_date'"
+            ))).scalar_one()
+            assert index_sql.startswith("CREATE UNIQUE INDEX")
+        assert "Removed 1 duplicate check-in records" in caplog.text
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.parametrize("make_index,third_title", [
+    (lambda: Index("ix_test_title_lower", func.lower(TaskCard.title), unique=True), "Write"),
+    # The repeated title belongs to a deleted task, outside the partial index
+    (lambda: Index(
+        "ix_test_live_title", TaskCard.title, unique=True, sqlite_where=text("is_deleted = 0")
+    ), "Read"),
+], ids=["expression", "partial"])
+async def test_create_schema_keeps_rows_for_other_unique_indexes(tmp_path, make_index, third_title):
+    """Test that adding another unique index to an existing database deletes no rows."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    index = None
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+            await conn.execute(TaskCard.__table__.insert(), [
+                {"id": "t1", "title": "Read", "is_deleted": False},
+                {"id": "t2", "title": "Run", "is_deleted": False},
+                {"id": "t3", "title": third_title, "is_deleted": True},
+            ])
+
+        index = make_index()
+        async with engine.begin() as conn:
+            await conn.run_sync(_create_schema)
+
+        async with engine.connect() as conn:
+            ids = (await conn.execute(text("SELECT id FROM task_cards ORDER BY id"))).scalars().all()
+            assert ids == ["t1", "t2", "t3"]
+    finally:
+        if index is not None:
+            TaskCard.__table__.indexes.discard(index)
+        await engine.dispose()
+
+
+async def test_make_engine_reuses_connections_with_pragmas(tmp_path):
+    """Test that file databases pool their connections and every connection gets the PRAGMAs."""
+    engine = make_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    try:
+        connections = []
+        for _ in range(2):
+            async with engine.connect() as conn:
+                connections.append((await conn.get_raw_connection()).driver_connection)
+                assert (await conn.exec_driver_sql("PRAGMA journal_mode")).scalar() == "wal"
+                assert (await conn.exec_driver_sql("PRAGMA synchronous")).scalar() == 1
+        assert connections[0] is connections[1]
+    finally:
+        await engine.dispose()
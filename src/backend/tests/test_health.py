@@ -1,23 +1,33 @@
-import pytest
+import pytest_asyncio
 
 
-@pytest.mark.asyncio
-async def test_health_check(client):
-    """Test that health check endpoint returns healthy status."""
-    response = await client.get("/api/health")
+# Both endpoints return bodies built once at import and touch no database,
+# so each is fetched once through the shared client
+@pytest_asyncio.fixture(scope="module")
+async def health_payload(http_client):
+    response = await http_client.get("/api/health")
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest_asyncio.fixture(scope="module")
+async def diagnostics_payload(http_client):
+    response = await http_client.get("/api/diagnostics")
     assert response.status_code == 200
-    data = response.json()
+    return response.json()
+
+
+async def test_health_check(health_payload):
+    """Test that health check endpoint returns healthy status."""
+    data = health_payload
     assert data["status"] == "healthy"
     assert "version" in data
     assert "packaged" in data
 
 
-@pytest.mark.asyncio
-async def test_diagnostics_endpoint(client):
+async def test_diagnostics_endpoint(diagnostics_payload):
     """Test that diagnostics endpoint returns system information."""
-    response = await client.get("/api/diagnostics")
-    assert response.status_code == 200
-    data = response.json()
+    data = diagnostics_payload
     assert data["status"] == "ok"
     assert "python_version" in data
     assert "database_path" in data
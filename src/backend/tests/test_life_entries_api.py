@@ -1,9 +1,39 @@
 """Tests for Life Entries API endpoints."""
+import math
+
 import pytest
+import pytest_asyncio
 from datetime import datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.life_entry import LifeEntry
+from app.utils.clock import utc_now
+from app.utils.count_cache import invalidate
+from app.utils.ids import uuid7
+
+SEEDED_CONTENTS = [f"Entry {i}" for i in range(5)]
+
+
+@pytest_asyncio.fixture
+async def seeded_entries(test_session: AsyncSession):
+    """Entries for the list tests, oldest first, inside the test's rolled-back transaction."""
+    # Same day, one second apart, so order and grouping are deterministic
+    base = utc_now().replace(hour=12, minute=0, second=0, microsecond=0)
+    entries = [
+        LifeEntry(
+            id=uuid7(),
+            content=content,
+            created_at=base + timedelta(seconds=i),
+            updated_at=base + timedelta(seconds=i),
+        )
+        for i, content in enumerate(SEEDED_CONTENTS)
+    ]
+    test_session.add_all(entries)
+    await test_session.commit()
+    invalidate(LifeEntry.__tablename__)
+    return entries
 
 
-@pytest.mark.asyncio
 async def test_create_life_entry(client):
     """Test creating a new life entry."""
     response = await client.post(
@@ -19,27 +49,16 @@ async def test_create_life_entry(client):
     assert data["is_deleted"] is False
 
 
-@pytest.mark.asyncio
-async def test_create_life_entry_empty_content(client):
-    """Test that empty content is rejected."""
-    response = await client.post(
-        "/api/life-entries",
-        json={"content": ""}
-    )
-    assert response.status_code == 422
-
-
-@pytest.mark.asyncio
-async def test_create_life_entry_whitespace_only(client):
-    """Test that whitespace-only content is rejected."""
+@pytest.mark.parametrize("content", ["", "   ", "\t", "\n", "\t\n"])
+async def test_create_life_entry_rejects_blank(client, content):
+    """Test that empty and whitespace-only content is rejected."""
     response = await client.post(
         "/api/life-entries",
-        json={"content": "   "}
+        json={"content": content}
     )
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
 async def test_get_life_entry(client):
     """Test getting a single life entry by ID."""
     # Create an entry first
@@ -58,53 +77,39 @@ async def test_get_life_entry(client):
 
 
 
-@pytest.mark.asyncio
 async def test_get_life_entry_not_found(client):
     """Test getting a non-existent life entry."""
     response = await client.get("/api/life-entries/non-existent-id")
     assert response.status_code == 404
 
 
-@pytest.mark.asyncio
-async def test_get_life_entries_pagination(client):
+async def test_get_life_entries_pagination(client, seeded_entries):
     """Test paginated retrieval of life entries."""
-    # Create multiple entries
-    for i in range(5):
-        await client.post(
-            "/api/life-entries",
-            json={"content": f"Entry {i}"}
-        )
-    
-    # Get first page
     response = await client.get("/api/life-entries?page=1&page_size=2")
     assert response.status_code == 200
     data = response.json()
     assert len(data["items"]) == 2
-    assert data["total"] == 5
+    assert data["total"] == len(seeded_entries)
     assert data["page"] == 1
     assert data["page_size"] == 2
-    assert data["total_pages"] == 3
+    assert data["total_pages"] == math.ceil(len(seeded_entries) / 2)
+    
+    # The last page holds the remainder
+    response = await client.get(f"/api/life-entries?page={data['total_pages']}&page_size=2")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == (len(seeded_entries) % 2 or 2)
 
 
-@pytest.mark.asyncio
-async def test_get_life_entries_reverse_chronological(client):
+async def test_get_life_entries_reverse_chronological(client, seeded_entries):
     """Test that entries are returned in reverse chronological order (newest first)."""
-    # Create entries
-    await client.post("/api/life-entries", json={"content": "First entry"})
-    await client.post("/api/life-entries", json={"content": "Second entry"})
-    await client.post("/api/life-entries", json={"content": "Third entry"})
-    
     response = await client.get("/api/life-entries")
     assert response.status_code == 200
     data = response.json()
     
     # Newest should be first
-    assert data["items"][0]["content"] == "Third entry"
-    assert data["items"][1]["content"] == "Second entry"
-    assert data["items"][2]["content"] == "First entry"
+    assert [item["content"] for item in data["items"]] == SEEDED_CONTENTS[::-1]
 
 
-@pytest.mark.asyncio
 async def test_update_life_entry(client):
     """Test updating a life entry."""
     # Create an entry
@@ -128,7 +133,24 @@ async def test_update_life_entry(client):
     assert data["created_at"] == original_created_at
 
 
-@pytest.mark.asyncio
+async def test_update_life_entry_unchanged_content(client):
+    """Test that an update without changes keeps updated_at."""
+    create_response = await client.post(
+        "/api/life-entries",
+        json={"content": "Same content"}
+    )
+    entry = create_response.json()
+
+    response = await client.put(
+        f"/api/life-entries/{entry['id']}",
+        json={"content": "  Same content  "}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["content"] == "Same content"
+    assert data["updated_at"] == entry["updated_at"]
+
+
 async def test_update_life_entry_not_found(client):
     """Test updating a non-existent life entry."""
     response = await client.put(
@@ -138,7 +160,6 @@ async def test_update_life_entry_not_found(client):
     assert response.status_code == 404
 
 
-@pytest.mark.asyncio
 async def test_soft_delete_life_entry(client):
     """Test soft deleting a life entry."""
     # Create an entry
@@ -156,17 +177,12 @@ async def test_soft_delete_life_entry(client):
     list_response = await client.get("/api/life-entries")
     assert all(item["id"] != entry_id for item in list_response.json()["items"])
     
-    # Entry should appear when including deleted
-    list_response = await client.get("/api/life-entries?include_deleted=true")
-    deleted_entry = next(
-        (item for item in list_response.json()["items"] if item["id"] == entry_id),
-        None
-    )
-    assert deleted_entry is not None
-    assert deleted_entry["is_deleted"] is True
+    # Entry is still stored, marked as deleted
+    get_response = await client.get(f"/api/life-entries/{entry_id}")
+    assert get_response.status_code == 200
+    assert get_response.json()["is_deleted"] is True
 
 
-@pytest.mark.asyncio
 async def test_hard_delete_life_entry(client):
     """Test hard deleting a life entry."""
     # Create an entry
@@ -185,27 +201,47 @@ async def test_hard_delete_life_entry(client):
     assert get_response.status_code == 404
 
 
-@pytest.mark.asyncio
 async def test_delete_life_entry_not_found(client):
     """Test deleting a non-existent life entry."""
     response = await client.delete("/api/life-entries/non-existent-id")
     assert response.status_code == 404
 
 
-@pytest.mark.asyncio
-async def test_get_life_entries_grouped(client):
+async def test_get_life_entries_grouped(client, seeded_entries):
     """Test getting life entries grouped by date."""
-    # Create entries
-    await client.post("/api/life-entries", json={"content": "Entry 1"})
-    await client.post("/api/life-entries", json={"content": "Entry 2"})
-    
     response = await client.get("/api/life-entries/grouped")
     assert response.status_code == 200
     data = response.json()
     
     assert "groups" in data
     assert "total" in data
-    assert data["total"] == 2
-    # All entries created today should be in one group
+    assert data["total"] == len(seeded_entries)
+    # All entries created on the same day should be in one group
     assert len(data["groups"]) == 1
-    assert len(data["groups"][0]["entries"]) == 2
+    assert len(data["groups"][0]["entries"]) == len(seeded_entries)
+
+
+async def test_get_life_entries_cursor_pagination(client, seeded_entries):
+    """Test keyset pagination walks all entries newest first without duplicates."""
+    seen = []
+    cursor = None
+    while True:
+        url = "/api/life-entries?page_size=2"
+        if cursor:
+            url += f"&cursor={cursor}"
+        response = await client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == len(seeded_entries)
+        seen.extend(item["content"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert seen == SEEDED_CONTENTS[::-1]
+
+
+async def test_get_life_entries_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+    response = await client.get("/api/life-entries?cursor=not-a-cursor")
+    assert response.status_code == 400
@@ -0,0 +1,56 @@
+"""Tests for Notification API endpoints."""
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from app.models.task_card import TaskCard
+from app.services.notification_service import NotificationService
+
+
+async def test_generate_notifications(client: AsyncClient, test_session):
+    """Test that one call creates the reminder and at-risk notifications exactly once."""
+    test_session.add_all([
+        TaskCard(id="new-habit", title="Read", is_habit=True),
+        TaskCard(
+            id="streak-habit",
+            title="Run",
+            is_habit=True,
+            current_streak=3,
+            last_checkin_date=date.today() - timedelta(days=1),
+        ),
+        TaskCard(id="plain-task", title="Groceries"),
+    ])
+    await test_session.commit()
+
+    response = await client.post("/api/notifications/generate")
+    assert response.status_code == 200
+    data = response.json()
+    assert sorted((n["data"]["habit_id"], n["data"].get("at_risk", False)) for n in data) == [
+        ("new-habit", False),
+        ("streak-habit", True),
+    ]
+
+    # Already generated today
+    response = await client.post("/api/notifications/generate")
+    assert response.status_code == 200
+    assert response.json() == []
+
+
+# Run twice: the second run must not be affected by the first run's rolled-back achievements
+@pytest.mark.parametrize("run", ["first", "repeat"])
+async def test_check_streak_achievements_batch(test_session, run):
+    """Test that batched achievement checks skip non-milestones and existing achievements."""
+    service = NotificationService(test_session)
+    first = await service.check_streak_achievement("habit-a", 7, "Read")
+    assert first is not None
+
+    created = await NotificationService(test_session).check_streak_achievements([
+        ("habit-a", 7, "Read"),
+        ("habit-b", 14, "Run"),
+        ("habit-b", 14, "Run"),
+        ("habit-c", 5, "Write"),
+    ])
+    assert [(n.related_habit_id, n.milestone) for n in created] == [("habit-b", 14)]
+
+    assert await NotificationService(test_session).check_streak_achievements([("habit-b", 14, "Run")]) == []
@@ -2,10 +2,8 @@
 Tests for Settings API endpoints
 Requirements: 1.2, 1.3
 """
-import pytest
 
 
-@pytest.mark.asyncio
 async def test_get_settings_default(client):
     """Test getting settings returns defaults when empty"""
     response = await client.get("/api/settings")
@@ -15,7 +13,6 @@ async def test_get_settings_default(client):
     assert data["theme"] == "system"
 
 
-@pytest.mark.asyncio
 async def test_update_settings(client):
     """Test updating settings persists changes"""
     # Update settings
@@ -33,7 +30,6 @@ async def test_update_settings(client):
     assert data["theme"] == "dark"
 
 
-@pytest.mark.asyncio
 async def test_export_data_empty(client):
     """Test exporting data from empty database"""
     response = await client.get("/api/settings/export")
@@ -56,7 +52,6 @@ async def test_export_data_empty(client):
     assert data["lifeEntries"] == []
 
 
-@pytest.mark.asyncio
 async def test_export_data_with_content(client):
     """Test exporting data includes created content"""
     # Create a task (returns 201 Created)
@@ -83,3 +78,14 @@ async def test_export_data_with_content(client):
     assert data["taskCards"][0]["title"] == "Test Task"
     assert len(data["lifeEntries"]) == 1
     assert data["lifeEntries"][0]["content"] == "Test Entry"
+
+
+async def test_update_settings_overwrites_existing_keys(client):
+    """Test updating an existing key replaces its value and keeps other keys"""
+    await client.put("/api/settings", json={"theme": "dark", "fontSize": 14})
+    
+    response = await client.put("/api/settings", json={"theme": "light"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["theme"] == "light"
+    assert data["fontSize"] == 14
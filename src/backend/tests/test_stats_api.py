@@ -0,0 +1,62 @@
+"""Tests for the stats overview API endpoint."""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.utils.clock import get_local_date
+
+
+async def test_stats_overview_empty_database(client):
+    """Test overview returns zeros when no tasks exist."""
+    response = await client.get("/api/stats/overview")
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert data["total_tasks"] == 0
+    assert data["completed_tasks"] == 0
+    assert data["pending_tasks"] == 0
+    assert data["completion_rate"] == 0.0
+    assert data["longest_streak"] == 0
+    assert data["today_checkins"] == 0
+
+
+async def test_stats_overview_with_checkin(client, habit_task):
+    """Test overview counts check-ins, completion and streaks."""
+    habit_id = habit_task["id"]
+    await client.post("/api/tasks", json={"title": "Buy groceries"})
+    
+    checkin_response = await client.post(f"/api/tasks/{habit_id}/checkin")
+    assert checkin_response.status_code == 200
+    
+    response = await client.get("/api/stats/overview")
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert data["total_tasks"] == 2
+    assert data["completed_tasks"] == 1
+    assert data["pending_tasks"] == 1
+    assert data["completion_rate"] == 50.0
+    assert data["longest_streak"] == 1
+    assert data["today_checkins"] == 1
+
+
+async def test_stats_overview_excludes_deleted_tasks(client, habit_task):
+    """Test that deleted tasks are not counted in the overview."""
+    task_id = habit_task["id"]
+    await client.post(f"/api/tasks/{task_id}/checkin")
+    await client.delete(f"/api/tasks/{task_id}")
+    
+    response = await client.get("/api/stats/overview")
+    assert response.status_code == 200
+    data = response.json()
+    
+    assert data["total_tasks"] == 0
+    assert data["completed_tasks"] == 0
+    assert data["longest_streak"] == 0
+
+
+@pytest.mark.parametrize("offset", [-840, -480, -330, 0, 300, 720])
+def test_get_local_date_matches_datetime_arithmetic(offset):
+    """Test the epoch-based local date agrees with shifting the UTC datetime."""
+    expected = (datetime.now(timezone.utc) - timedelta(minutes=offset)).date()
+    assert get_local_date(offset) == expected
@@ -1,25 +1,64 @@
 """Tests for Task Card CRUD API endpoints."""
+from datetime import date, datetime, timedelta, timezone
+
+import orjson
 import pytest
+import pytest_asyncio
+from fastapi import BackgroundTasks, HTTPException
 from httpx import AsyncClient
-
-
-@pytest.mark.asyncio
-async def test_get_tasks_empty(client: AsyncClient):
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.api.tasks import (
+    checkin_task,
+    generate_checkin_notifications,
+    get_task,
+    get_task_checkins,
+    get_tasks,
+)
+from app.database import Base
+from app.models.checkin_record import CheckinRecord
+from app.models.notification import Notification
+from app.models.task_card import TaskCard
+from app.schemas.task_card import TaskCardCreate
+from app.utils.clock import get_local_date
+from app.utils.ids import uuid7
+
+BLANK_TITLES = ["", "   ", "\t\n"]
+BLANK_TITLE_IDS = ["empty", "whitespace", "tabs"]
+MISSING_TASK_ID = "non-existent-id"
+
+# Built from the request schema once, so the payload is encoded a single time
+# and can't drift from the fields TaskCardCreate accepts
+CREATE_TASK_BODY = TaskCardCreate(
+    title="Test Task", content="Test content", is_habit=False
+).model_dump_json(exclude_unset=True)
+
+
+@pytest.fixture(scope="module")
+def now():
+    # Reminder validation compares against the server's wall clock, so this
+    # can't be frozen; one reading per module is enough since the reminder
+    # tests stay an hour or more away from the one-minute tolerance
+    return datetime.now(timezone.utc)
+
+
+async def test_get_tasks_empty(test_session: AsyncSession):
     """Test getting tasks when none exist."""
-    response = await client.get("/api/tasks")
+    # Tests that only check a handler's own result call it directly with the
+    # test session; routing and validation are covered by the client tests
+    response = await get_tasks(
+        list_id=None, include_deleted=False, include_content=True, db=test_session
+    )
     assert response.status_code == 200
-    assert response.json() == []
+    assert orjson.loads(response.body) == []
 
 
-@pytest.mark.asyncio
 async def test_create_task(client: AsyncClient):
     """Test creating a new task card."""
-    task_data = {
-        "title": "Test Task",
-        "content": "Test content",
-        "is_habit": False
-    }
-    response = await client.post("/api/tasks", json=task_data)
+    response = await client.post(
+        "/api/tasks", content=CREATE_TASK_BODY, headers={"Content-Type": "application/json"}
+    )
     assert response.status_code == 201
     data = response.json()
     assert data["title"] == "Test Task"
@@ -29,29 +68,18 @@ async def test_create_task(client: AsyncClient):
     assert "id" in data
 
 
-@pytest.mark.asyncio
-async def test_create_task_empty_title_rejected(client: AsyncClient):
-    """Test that empty title is rejected."""
-    task_data = {"title": ""}
+@pytest.mark.parametrize("title", BLANK_TITLES, ids=BLANK_TITLE_IDS)
+async def test_create_task_blank_title_rejected(client: AsyncClient, title):
+    """Test that empty and whitespace-only titles are rejected."""
+    task_data = {"title": title}
     response = await client.post("/api/tasks", json=task_data)
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
-async def test_create_task_whitespace_title_rejected(client: AsyncClient):
-    """Test that whitespace-only title is rejected."""
-    task_data = {"title": "   "}
-    response = await client.post("/api/tasks", json=task_data)
-    assert response.status_code == 422
-
-
-@pytest.mark.asyncio
-async def test_get_task_by_id(client: AsyncClient):
+async def test_get_task_by_id(client: AsyncClient, task_factory):
     """Test getting a task by ID."""
     # Create a task first
-    task_data = {"title": "Get Test Task"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Get Test Task"))["id"]
     
     # Get the task
     response = await client.get(f"/api/tasks/{task_id}")
@@ -60,20 +88,22 @@ async def test_get_task_by_id(client: AsyncClient):
 
 
 
-@pytest.mark.asyncio
-async def test_get_task_not_found(client: AsyncClient):
-    """Test getting a non-existent task."""
-    response = await client.get("/api/tasks/non-existent-id")
-    assert response.status_code == 404
+@pytest.mark.parametrize("call_handler", [
+    lambda db: get_task(MISSING_TASK_ID, db=db),
+    lambda db: checkin_task(MISSING_TASK_ID, BackgroundTasks(), timezone_offset=0, db=db),
+    lambda db: get_task_checkins(MISSING_TASK_ID, limit=30, db=db),
+], ids=["get", "checkin", "checkins"])
+async def test_task_not_found(test_session: AsyncSession, call_handler):
+    """Test that reading or checking in on a non-existent task is a 404."""
+    with pytest.raises(HTTPException) as exc_info:
+        await call_handler(test_session)
+    assert exc_info.value.status_code == 404
 
 
-@pytest.mark.asyncio
-async def test_update_task(client: AsyncClient):
+async def test_update_task(client: AsyncClient, task_factory):
     """Test updating a task card."""
     # Create a task first
-    task_data = {"title": "Original Title"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Original Title"))["id"]
     
     # Update the task
     update_data = {"title": "Updated Title", "content": "New content"}
@@ -84,27 +114,30 @@ async def test_update_task(client: AsyncClient):
     assert data["content"] == "New content"
 
 
-@pytest.mark.asyncio
-async def test_update_task_whitespace_title_rejected(client: AsyncClient):
-    """Test that updating with whitespace-only title is rejected."""
+async def test_update_task_not_found(client: AsyncClient):
+    """Test updating a non-existent task, with and without changes."""
+    response = await client.put("/api/tasks/non-existent-id", json={"title": "New"})
+    assert response.status_code == 404
+    response = await client.put("/api/tasks/non-existent-id", json={})
+    assert response.status_code == 404
+
+
+@pytest.mark.parametrize("title", BLANK_TITLES, ids=BLANK_TITLE_IDS)
+async def test_update_task_blank_title_rejected(client: AsyncClient, task_factory, title):
+    """Test that updating with an empty or whitespace-only title is rejected."""
     # Create a task first
-    task_data = {"title": "Original Title"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Original Title"))["id"]
     
-    # Try to update with whitespace title
-    update_data = {"title": "   "}
+    # Try to update with a blank title
+    update_data = {"title": title}
     response = await client.put(f"/api/tasks/{task_id}", json=update_data)
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
-async def test_soft_delete_task(client: AsyncClient):
+async def test_soft_delete_task(client: AsyncClient, task_factory):
     """Test soft deleting a task card."""
     # Create a task first
-    task_data = {"title": "Task to Delete"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Task to Delete"))["id"]
     
     # Soft delete the task
     response = await client.delete(f"/api/tasks/{task_id}")
@@ -112,25 +145,32 @@ async def test_soft_delete_task(client: AsyncClient):
     
     # Task should not appear in normal list
     list_response = await client.get("/api/tasks")
-    assert all(t["id"] != task_id for t in list_response.json())
+    assert task_id not in {t["id"] for t in list_response.json()}
     
     # Task should appear when including deleted
     list_response = await client.get("/api/tasks?include_deleted=true")
-    deleted_task = next((t for t in list_response.json() if t["id"] == task_id), None)
-    assert deleted_task is not None
-    assert deleted_task["is_deleted"] is True
+    tasks_by_id = {t["id"]: t for t in list_response.json()}
+    assert task_id in tasks_by_id
+    assert tasks_by_id[task_id]["is_deleted"] is True
+
+
+async def test_delete_task_not_found(client: AsyncClient):
+    """Test soft and hard deleting a non-existent task."""
+    response = await client.delete("/api/tasks/non-existent-id")
+    assert response.status_code == 404
+    response = await client.delete("/api/tasks/non-existent-id?hard_delete=true")
+    assert response.status_code == 404
 
 
-@pytest.mark.asyncio
-async def test_filter_tasks_by_list_id(client: AsyncClient):
+async def test_filter_tasks_by_list_id(client: AsyncClient, task_factory):
     """Test filtering tasks by list_id."""
     # Create a list first
     list_response = await client.post("/api/lists", json={"name": "Test List"})
     list_id = list_response.json()["id"]
     
     # Create tasks with and without list_id
-    await client.post("/api/tasks", json={"title": "Task in list", "list_id": list_id})
-    await client.post("/api/tasks", json={"title": "Task without list"})
+    await task_factory(title="Task in list", list_id=list_id)
+    await task_factory(title="Task without list")
     
     # Filter by list_id
     response = await client.get(f"/api/tasks?list_id={list_id}")
@@ -139,13 +179,21 @@ async def test_filter_tasks_by_list_id(client: AsyncClient):
     assert tasks[0]["title"] == "Task in list"
 
 
-@pytest.mark.asyncio
-async def test_checkin_task_creates_record(client: AsyncClient):
+async def test_get_tasks_without_content(client: AsyncClient, task_factory):
+    """Test that include_content=false leaves out the markdown content."""
+    await task_factory(title="Slim Task", content="Long markdown body")
+
+    response = await client.get("/api/tasks?include_content=false")
+    assert response.status_code == 200
+    tasks = response.json()
+    assert len(tasks) == 1
+    assert tasks[0]["title"] == "Slim Task"
+    assert "content" not in tasks[0]
+
+
+async def test_checkin_task_creates_record(client: AsyncClient, habit_task):
     """Test that checking in creates a check-in record and updates streak."""
-    # Create a habit task
-    task_data = {"title": "Daily Exercise", "is_habit": True}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = habit_task["id"]
     
     # Check in
     response = await client.post(f"/api/tasks/{task_id}/checkin")
@@ -156,13 +204,9 @@ async def test_checkin_task_creates_record(client: AsyncClient):
     assert data["last_checkin_date"] is not None
 
 
-@pytest.mark.asyncio
-async def test_checkin_task_idempotent_same_day(client: AsyncClient):
+async def test_checkin_task_idempotent_same_day(client: AsyncClient, habit_task):
     """Test that checking in twice on the same day doesn't double count."""
-    # Create a habit task
-    task_data = {"title": "Daily Reading", "is_habit": True}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = habit_task["id"]
     
     # Check in twice
     await client.post(f"/api/tasks/{task_id}/checkin")
@@ -174,25 +218,84 @@ async def test_checkin_task_idempotent_same_day(client: AsyncClient):
     assert data["current_streak"] == 1
 
 
-@pytest.mark.asyncio
-async def test_checkin_task_not_found(client: AsyncClient):
-    """Test checking in on a non-existent task."""
-    response = await client.post("/api/tasks/non-existent-id/checkin")
-    assert response.status_code == 404
+async def test_checkin_generates_daily_complete_notification(client: AsyncClient, habit_task):
+    """Test that checking in the last open habit creates a daily-complete notification."""
+    task_id = habit_task["id"]
+
+    response = await client.post(f"/api/tasks/{task_id}/checkin")
+    assert response.status_code == 200
+
+    notifications = (await client.get("/api/notifications")).json()["notifications"]
+    assert [n["type"] for n in notifications] == ["daily_complete"]
 
 
-@pytest.mark.asyncio
-async def test_get_task_checkins(client: AsyncClient):
+async def test_checkin_with_open_habits_skips_daily_complete(client: AsyncClient, task_factory):
+    """Test that no daily-complete notification is created while other habits are open."""
+    first = await task_factory(title="Stretch", is_habit=True)
+    await task_factory(title="Meditate", is_habit=True)
+
+    response = await client.post(f"/api/tasks/{first['id']}/checkin")
+    assert response.status_code == 200
+
+    notifications = (await client.get("/api/notifications")).json()["notifications"]
+    assert notifications == []
+
+
+async def test_checkin_milestone_generates_both_notifications(tmp_path):
+    """Test that the concurrent achievement and daily-complete checks both create notifications."""
+    # The in-memory test engine shares one connection between all sessions;
+    # the concurrent checks need a file database with a real connection pool
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'lifeflow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    today = get_local_date(0)
+    async with session_factory() as session:
+        session.add(TaskCard(id="milestone-task", title="Run", is_habit=True, last_checkin_date=today))
+        await session.commit()
+
+    try:
+        await generate_checkin_notifications(session_factory, "milestone-task", 7, "Run", today, True)
+        async with session_factory() as session:
+            types = (await session.execute(select(Notification.type))).scalars().all()
+    finally:
+        await engine.dispose()
+    assert sorted(types) == ["achievement", "daily_complete"]
+
+
+async def test_checkin_non_habit_skips_daily_complete(client: AsyncClient, task_factory):
+    """Test that checking in a regular task does not mark the day complete."""
+    await task_factory(title="Open Habit", is_habit=True)
+    task_id = (await task_factory(title="One-off Task"))["id"]
+
+    response = await client.post(f"/api/tasks/{task_id}/checkin")
+    assert response.status_code == 200
+
+    notifications = (await client.get("/api/notifications")).json()["notifications"]
+    assert notifications == []
+
+
+@pytest_asyncio.fixture
+async def habit_with_checkin(test_session: AsyncSession) -> str:
+    # Written straight to the database; tests using it only read check-ins back
+    today = get_local_date()
+    task = TaskCard(
+        id=uuid7(),
+        title="Daily Meditation",
+        is_habit=True,
+        current_streak=1,
+        longest_streak=1,
+        last_checkin_date=today,
+    )
+    test_session.add_all([task, CheckinRecord(id=uuid7(), task_id=task.id, checkin_date=today)])
+    await test_session.commit()
+    return task.id
+
+
+async def test_get_task_checkins(client: AsyncClient, habit_with_checkin):
     """Test getting check-in records for a task."""
-    # Create a habit task
-    task_data = {"title": "Daily Meditation", "is_habit": True}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
-    
-    # Check in
-    await client.post(f"/api/tasks/{task_id}/checkin")
+    task_id = habit_with_checkin
     
-    # Get check-ins
     response = await client.get(f"/api/tasks/{task_id}/checkins")
     assert response.status_code == 200
     records = response.json()
@@ -200,13 +303,9 @@ async def test_get_task_checkins(client: AsyncClient):
     assert records[0]["task_id"] == task_id
 
 
-@pytest.mark.asyncio
-async def test_checkin_with_timezone(client: AsyncClient):
+async def test_checkin_with_timezone(client: AsyncClient, habit_task):
     """Test checking in with timezone offset."""
-    # Create a habit task
-    task_data = {"title": "Daily Journal", "is_habit": True}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = habit_task["id"]
     
     # Check in with timezone offset (UTC+8 = -480 minutes)
     response = await client.post(
@@ -218,13 +317,23 @@ async def test_checkin_with_timezone(client: AsyncClient):
     assert data["current_streak"] == 1
 
 
-@pytest.mark.asyncio
-async def test_create_task_with_reminder_time(client: AsyncClient):
-    """Test creating a task with a valid reminder time."""
-    from datetime import datetime, timedelta, timezone
+async def test_checkin_with_timezone_query_param(client: AsyncClient, habit_task):
+    """Test passing the timezone offset in the query string."""
+    task_id = habit_task["id"]
+    
+    response = await client.post(f"/api/tasks/{task_id}/checkin?timezone_offset=-480")
+    assert response.status_code == 200
+    assert response.json()["last_checkin_date"] == get_local_date(-480).isoformat()
     
+    # Offsets outside UTC-12..UTC+14 are rejected
+    response = await client.post(f"/api/tasks/{task_id}/checkin?timezone_offset=-900")
+    assert response.status_code == 422
+
+
+async def test_create_task_with_reminder_time(client: AsyncClient, now):
+    """Test creating a task with a valid reminder time."""
     # Set reminder time to 1 hour in the future
-    future_time = datetime.now(timezone.utc) + timedelta(hours=1)
+    future_time = now + timedelta(hours=1)
     task_data = {
         "title": "Task with Reminder",
         "reminder_time": future_time.isoformat()
@@ -235,13 +344,10 @@ async def test_create_task_with_reminder_time(client: AsyncClient):
     assert data["reminder_time"] is not None
 
 
-@pytest.mark.asyncio
-async def test_create_task_with_past_reminder_rejected(client: AsyncClient):
+async def test_create_task_with_past_reminder_rejected(client: AsyncClient, now):
     """Test that creating a task with a past reminder time is rejected."""
-    from datetime import datetime, timedelta, timezone
-    
     # Set reminder time to 1 hour in the past
-    past_time = datetime.now(timezone.utc) - timedelta(hours=1)
+    past_time = now - timedelta(hours=1)
     task_data = {
         "title": "Task with Past Reminder",
         "reminder_time": past_time.isoformat()
@@ -250,38 +356,29 @@ async def test_create_task_with_past_reminder_rejected(client: AsyncClient):
     assert response.status_code == 422
 
 
-@pytest.mark.asyncio
-async def test_update_task_reminder_time(client: AsyncClient):
+async def test_update_task_reminder_time(client: AsyncClient, task_factory, now):
     """Test updating a task's reminder time."""
-    from datetime import datetime, timedelta, timezone
-    
     # Create a task without reminder
-    task_data = {"title": "Task to Update Reminder"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Task to Update Reminder"))["id"]
     
     # Update with a future reminder time
-    future_time = datetime.now(timezone.utc) + timedelta(hours=2)
+    future_time = now + timedelta(hours=2)
     update_data = {"reminder_time": future_time.isoformat()}
     response = await client.put(f"/api/tasks/{task_id}", json=update_data)
     assert response.status_code == 200
     assert response.json()["reminder_time"] is not None
 
 
-@pytest.mark.asyncio
-async def test_clear_task_reminder_time(client: AsyncClient):
+async def test_clear_task_reminder_time(client: AsyncClient, task_factory, now):
     """Test clearing a task's reminder time using clear_reminder flag."""
-    from datetime import datetime, timedelta, timezone
-    
     # Create a task with reminder
-    future_time = datetime.now(timezone.utc) + timedelta(hours=1)
-    task_data = {
-        "title": "Task with Reminder to Clear",
-        "reminder_time": future_time.isoformat()
-    }
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
-    assert create_response.json()["reminder_time"] is not None
+    future_time = now + timedelta(hours=1)
+    task = await task_factory(
+        title="Task with Reminder to Clear",
+        reminder_time=future_time.isoformat(),
+    )
+    task_id = task["id"]
+    assert task["reminder_time"] is not None
     
     # Clear the reminder
     update_data = {"clear_reminder": True}
@@ -290,18 +387,47 @@ async def test_clear_task_reminder_time(client: AsyncClient):
     assert response.json()["reminder_time"] is None
 
 
-@pytest.mark.asyncio
-async def test_update_task_with_past_reminder_rejected(client: AsyncClient):
+async def test_update_task_with_past_reminder_rejected(client: AsyncClient, task_factory, now):
     """Test that updating a task with a past reminder time is rejected."""
-    from datetime import datetime, timedelta, timezone
-    
     # Create a task
-    task_data = {"title": "Task to Update with Past Reminder"}
-    create_response = await client.post("/api/tasks", json=task_data)
-    task_id = create_response.json()["id"]
+    task_id = (await task_factory(title="Task to Update with Past Reminder"))["id"]
     
     # Try to update with a past reminder time
-    past_time = datetime.now(timezone.utc) - timedelta(hours=1)
+    past_time = now - timedelta(hours=1)
     update_data = {"reminder_time": past_time.isoformat()}
     response = await client.put(f"/api/tasks/{task_id}", json=update_data)
     assert response.status_code == 422
+
+
+@pytest.mark.parametrize("days_since_last, current_streak, longest_streak, expected, expected_longest", [
+    (None, 0, 0, 1, 1),
+    (1, 4, 4, 5, 5),
+    (1, 2, 9, 3, 9),
+    (3, 4, 6, 1, 6),
+])
+async def test_checkin_streak_transitions(
+    client: AsyncClient, test_session,
+    days_since_last, current_streak, longest_streak, expected, expected_longest
+):
+    """Test streak continuation and reset relative to the last check-in date."""
+    today = get_local_date(0)
+    last_checkin_date = (
+        None if days_since_last is None
+        else date.fromordinal(today.toordinal() - days_since_last)
+    )
+    test_session.add(TaskCard(
+        id="streak-task",
+        title="Streak",
+        is_habit=True,
+        current_streak=current_streak,
+        longest_streak=longest_streak,
+        last_checkin_date=last_checkin_date,
+    ))
+    await test_session.commit()
+
+    response = await client.post("/api/tasks/streak-task/checkin", json={"timezone_offset": 0})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["current_streak"] == expected
+    assert data["longest_streak"] == expected_longest
+    assert data["last_checkin_date"] == today.isoformat()
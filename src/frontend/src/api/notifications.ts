@@ -94,7 +94,14 @@ export const notificationsApi = {
   },
 
   /**
-   * Generate habit reminders (called on app load)
+   * Generate all of today's notifications (called on app load)
+   */
+  async generateAll(): Promise<Notification[]> {
+    return api.post<Notification[]>('/notifications/generate')
+  },
+
+  /**
+   * Generate habit reminders
    */
   async generateReminders(): Promise<Notification[]> {
     return api.post<Notification[]>('/notifications/generate-reminders')
@@ -58,9 +58,13 @@ export const tasksApi = {
 
   /**
    * Check in on a habit task
+   * The timezone offset goes in the query string, so no request body is sent
    */
   async checkin(taskId: string, data?: CheckinRequest): Promise<Task> {
-    return api.post<Task>(`/tasks/${taskId}/checkin`, data)
+    const query = data?.timezone_offset !== undefined
+      ? `?timezone_offset=${data.timezone_offset}`
+      : ''
+    return api.post<Task>(`/tasks/${taskId}/checkin${query}`)
   },
 
   /**
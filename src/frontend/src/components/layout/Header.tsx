@@ -2,7 +2,7 @@ import * as React from 'react'
 import { useLocation } from 'react-router-dom'
 import { cn, getLocalDateString } from '@/lib/utils'
 import { useUIStore } from '@/stores/ui-store'
-import { useUnreadCount, useGenerateReminders, useGenerateAtRiskNotifications } from '@/hooks/useNotifications'
+import { useUnreadCount, useGenerateNotifications } from '@/hooks/useNotifications'
 import { useTasks } from '@/hooks/useTasks'
 import { useInfiniteLifeEntries } from '@/hooks/useLifeEntries'
 import { useStatsOverview } from '@/hooks/useStats'
@@ -18,8 +18,7 @@ export function Header({ className }: HeaderProps) {
   const location = useLocation()
   const { toggleSidebar } = useUIStore()
   const { data: unreadData } = useUnreadCount()
-  const generateReminders = useGenerateReminders()
-  const generateAtRisk = useGenerateAtRiskNotifications()
+  const generateNotifications = useGenerateNotifications()
   const [showNotifications, setShowNotifications] = React.useState(false)
   const notificationButtonRef = React.useRef<HTMLButtonElement>(null)
 
@@ -133,8 +132,7 @@ export function Header({ className }: HeaderProps) {
     const todayStr = getLocalDateString()
     
     if (lastGenDate !== todayStr) {
-      generateReminders.mutate()
-      generateAtRisk.mutate()
+      generateNotifications.mutate()
       localStorage.setItem('lifeflow_last_notification_gen', todayStr)
     }
   }, []) // eslint-disable-line react-hooks/exhaustive-deps
@@ -85,6 +85,21 @@ export function useDeleteNotification() {
   })
 }
 
+/**
+ * Hook to generate all of today's notifications in one request
+ */
+export function useGenerateNotifications() {
+  const queryClient = useQueryClient()
+
+  return useMutation({
+    mutationFn: () => notificationsApi.generateAll(),
+    onSuccess: () => {
+      // Refetch notifications
+      queryClient.invalidateQueries({ queryKey: notificationKeys.all })
+    },
+  })
+}
+
 /**
  * Hook to generate habit reminders
  */